@@ -0,0 +1,57 @@
+from src.consumer.purchase_consumer import PurchaseConsumer
+from src.exception.invalid_operation_exception import InvalidOperationException
+
+class AuditLog(PurchaseConsumer):
+    """
+    Consumer that keeps a readable record of every ticket purchase, optionally appending
+    each entry to a file. Entries are kept across draws.
+    """
+
+    def __init__(self, output_path=None):
+        """
+        Initialises an AuditLog instance with no entries.
+
+        Parameters:
+            output_path (str): The file the entries are appended to. Optional.
+        """
+        super().__init__()
+        self.output_path = output_path
+        self.entries = []
+
+    def consume_batch(self, events):
+        """
+        Records an entry for each purchase in a batch.
+
+        Parameters:
+            events (list of PurchaseEvent): The purchase events to process.
+        """
+        entries = []
+        for event in events:
+            tickets = ", ".join(' '.join(map(str, numbers)) for numbers in event.ticket_numbers)
+            entries.append(f"#{event.sequence} {event.user_name} purchased {len(event.ticket_numbers)} ticket(s): {tickets}")
+
+        self.entries.extend(entries)
+        if self.output_path is not None:
+            with open(self.output_path, "a") as file:
+                file.writelines(f"{entry}\n" for entry in entries)
+
+    def get_state(self):
+        """
+        Captures the number of entries recorded.
+
+        Returns:
+            int: The number of entries recorded.
+        """
+        return len(self.entries)
+
+    def restore_state(self, state):
+        """
+        Removes the entries recorded since a captured state.
+
+        Parameters:
+            state (int): The number of entries recorded when the state was captured.
+        """
+        if self.output_path is not None and state < len(self.entries):
+            raise InvalidOperationException(f"Audit log entries already written to {self.output_path} cannot be replayed.")
+
+        del self.entries[state:]
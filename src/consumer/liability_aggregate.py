@@ -0,0 +1,63 @@
+from collections import Counter
+from src.consumer.purchase_consumer import PurchaseConsumer
+from src.liability_analysis import LiabilityAnalysis
+
+class LiabilityAggregate(PurchaseConsumer):
+    """
+    Consumer that keeps a live histogram of purchased ticket numbers, from which the payout
+    liability of the draw can be analysed at any time without walking the users' tickets.
+    """
+
+    def __init__(self):
+        """
+        Initialises a LiabilityAggregate instance with an empty ticket histogram.
+        """
+        super().__init__()
+        self.ticket_histogram = Counter()
+
+    def consume_batch(self, events):
+        """
+        Adds the tickets in a batch of purchases to the ticket histogram.
+
+        Parameters:
+            events (list of PurchaseEvent): The purchase events to process.
+        """
+        for event in events:
+            for numbers in event.ticket_numbers:
+                self.ticket_histogram[sum(1 << number for number in numbers)] += 1
+
+    def get_state(self):
+        """
+        Captures the ticket histogram.
+
+        Returns:
+            Counter: A copy of the ticket histogram.
+        """
+        return Counter(self.ticket_histogram)
+
+    def restore_state(self, state):
+        """
+        Restores a captured ticket histogram.
+
+        Parameters:
+            state (Counter): The captured ticket histogram.
+        """
+        self.ticket_histogram = Counter(state)
+
+    def reset(self):
+        """
+        Clears the ticket histogram for a new draw.
+        """
+        self.ticket_histogram = Counter()
+
+    def get_analysis(self, pot_size):
+        """
+        Analyses the payout liability of the tickets purchased so far.
+
+        Parameters:
+            pot_size (float): The pot size used to calculate the payouts.
+
+        Returns:
+            LiabilityAnalysis: The liability analysis of the purchased tickets.
+        """
+        return LiabilityAnalysis.from_histogram(self.ticket_histogram, pot_size)
@@ -0,0 +1,53 @@
+from src.consumer.purchase_consumer import PurchaseConsumer
+
+class PotCounter(PurchaseConsumer):
+    """
+    Consumer that adds the value of purchased tickets to the raffle pot.
+    """
+
+    def __init__(self, raffle):
+        """
+        Initialises a PotCounter instance for a raffle.
+
+        Parameters:
+            raffle (Raffle): The raffle whose pot is increased.
+        """
+        super().__init__()
+        self.raffle = raffle
+        self.ticket_count = 0
+
+    def consume_batch(self, events):
+        """
+        Increases the pot size by the total value of the tickets in a batch of purchases.
+
+        Parameters:
+            events (list of PurchaseEvent): The purchase events to process.
+        """
+        ticket_count = sum(len(event.ticket_numbers) for event in events)
+        self.ticket_count += ticket_count
+        self.raffle.increase_pot_size(ticket_count)
+
+    def get_state(self):
+        """
+        Captures the number of tickets added to the pot in the current draw.
+
+        Returns:
+            int: The number of tickets added to the pot.
+        """
+        return self.ticket_count
+
+    def restore_state(self, state):
+        """
+        Takes the tickets counted since a captured state back out of the pot.
+
+        Parameters:
+            state (int): The number of tickets added to the pot when the state was captured.
+        """
+        self.raffle.increase_pot_size(state - self.ticket_count)
+        self.ticket_count = state
+
+    def reset(self):
+        """
+        Starts counting the tickets of a new draw. Ticket sales already in the pot stay there.
+        """
+        self.ticket_count = 0
@@ -0,0 +1,55 @@
+from abc import ABC, abstractmethod
+
+class PurchaseConsumer(ABC):
+    """
+    Base class for consumers of the purchase stream. Each consumer tracks its own position
+    in the stream, receives purchase events in batches, and can capture the state built from
+    the events consumed so far, so replaying events from a checkpoint does not apply them twice.
+    """
+
+    def __init__(self):
+        """
+        Initialises a PurchaseConsumer instance at the start of the stream.
+        """
+        self.position = 0
+
+    @abstractmethod
+    def consume_batch(self, events):
+        """
+        Processes a batch of purchase events in stream order.
+
+        Parameters:
+            events (list of PurchaseEvent): The purchase events to process.
+        """
+
+    @abstractmethod
+    def get_state(self):
+        """
+        Captures the state built from the events consumed so far.
+
+        Returns:
+            object: A copy of the state that can be passed to restore_state().
+        """
+
+    @abstractmethod
+    def restore_state(self, state):
+        """
+        Restores the state captured by get_state().
+
+        Parameters:
+            state (object): The captured state.
+        """
+
+    def checkpoint(self):
+        """
+        Captures the position of the consumer together with its state, to replay events from later.
+
+        Returns:
+            tuple: A tuple containing the position and the captured state.
+        """
+        return self.position, self.get_state()
+
+    def reset(self):
+        """
+        Clears any state that only applies to the current draw. Consumers keep their state by default.
+        """
@@ -0,0 +1,86 @@
+from array import array
+from src.consumer.purchase_consumer import PurchaseConsumer
+from src.ticket import Ticket
+
+class TicketStore(PurchaseConsumer):
+    """
+    Consumer that adds purchased tickets to the users of a raffle. It is the only writer of
+    users' tickets on the purchase path. Alongside each user's Ticket objects it keeps the
+    number masks of the user's tickets in an integer array indexed by user id, which is what
+    settlement loops over.
+    """
+
+    def __init__(self, raffle):
+        """
+        Initialises a TicketStore instance for a raffle with no tickets.
+
+        Parameters:
+            raffle (Raffle): The raffle whose users receive the tickets.
+        """
+        super().__init__()
+        self.raffle = raffle
+        self.number_masks = []
+
+    def add_tickets(self, user_id, tickets):
+        """
+        Records the number masks of tickets held by a user.
+
+        Parameters:
+            user_id (int): The id of the user.
+            tickets (list of Ticket): The tickets to record.
+        """
+        while len(self.number_masks) <= user_id:
+            self.number_masks.append(array('H'))
+
+        self.number_masks[user_id].extend(ticket.get_number_mask() for ticket in tickets)
+
+    def load_users(self, users):
+        """
+        Records the tickets of users loaded into the raffle without being purchased.
+
+        Parameters:
+            users (list of User): The loaded users.
+        """
+        for user in users:
+            self.add_tickets(self.raffle.user_ids[user.name], user.tickets)
+
+    def consume_batch(self, events):
+        """
+        Adds the tickets in a batch of purchases to the users who purchased them.
+
+        Parameters:
+            events (list of PurchaseEvent): The purchase events to process.
+        """
+        for event in events:
+            user = self.raffle.add_user(event.user_name)
+            tickets = [Ticket(numbers) for numbers in event.ticket_numbers]
+            user.tickets.extend(tickets)
+            self.add_tickets(self.raffle.user_ids[user.name], tickets)
+
+    def get_state(self):
+        """
+        Captures the number of tickets held by each user.
+
+        Returns:
+            list of int: The number of tickets of each user, indexed by user id.
+        """
+        return [len(user.tickets) for user in self.raffle.users]
+
+    def restore_state(self, state):
+        """
+        Removes the tickets added since a captured state.
+
+        Parameters:
+            state (list of int): The number of tickets of each user when the state was captured.
+        """
+        for user_id, user in enumerate(self.raffle.users):
+            ticket_count = state[user_id] if user_id < len(state) else 0
+            del user.tickets[ticket_count:]
+            if user_id < len(self.number_masks):
+                del self.number_masks[user_id][ticket_count:]
+
+    def reset(self):
+        """
+        Clears the number masks for a new draw.
+        """
+        self.number_masks = []
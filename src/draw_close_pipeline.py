@@ -0,0 +1,159 @@
+from src.raffle import Raffle
+from src.raffle_results import RaffleResults
+from src.exception.invalid_input_exception import InvalidInputException
+
+class DrawClosePipeline:
+    """
+    Settles a raffle draw as a pipeline of three stages: matching chunks of users' ticket number
+    masks against the winning numbers, aggregating the matches into payouts, and writing the
+    payout records. Each stage is a generator that pulls from the stage before it, so a chunk is
+    only matched once the payouts of the previous chunk have been written, and work never piles
+    up in memory. The stages take turns on one thread, because matching is CPU-bound and threads
+    would only contend for the GIL.
+
+    The payout of a ticket depends on the number of winning tickets in its prize group. When those
+    counts are given up front, e.g. from a LiabilityAggregate, the payouts of the first chunk are
+    written as soon as it is matched, and the given counts are checked against the matched tickets
+    once all chunks are matched. Otherwise the matches are aggregated in full before payouts are
+    written. Without a payout writer, nothing is written early, so all tickets are matched as a
+    single chunk.
+
+    If a stage or the payout writer fails, the error is raised without storing results in the raffle.
+    """
+
+    def __init__(self, raffle, payout_writer=None, winner_counts=None, chunk_size=1000):
+        """
+        Initialises a DrawClosePipeline instance for a raffle.
+
+        Parameters:
+            raffle (Raffle): The raffle to settle, with its winning numbers already generated.
+            payout_writer (callable): Called with the group name, user name, winning ticket count and total reward of each payout.
+            winner_counts (dict): The number of winning tickets in each prize group, keyed by match count. Optional.
+            chunk_size (int): The number of users matched per chunk when payouts are written.
+        """
+        self.raffle = raffle
+        self.payout_writer = payout_writer
+        self.winner_counts = winner_counts
+        self.chunk_size = chunk_size
+
+    def run(self):
+        """
+        Runs the pipeline and stores the results in the raffle. The pot is reconciled
+        from the results when the draw is ended.
+
+        Returns:
+            RaffleResults: The results of the draw.
+        """
+        self.raffle.apply_purchases()
+
+        results = RaffleResults(Raffle.GROUP_NAMES.values(), self.raffle.users)
+        user_count = len(self.raffle.ticket_store.number_masks)
+        chunk_size = self.chunk_size if self.payout_writer is not None else max(1, user_count)
+
+        matches = self.match_tickets(chunk_size)
+        payouts = self.aggregate_payouts(matches)
+        self.write_payouts(payouts, results)
+
+        self.raffle.raffle_results = results
+        return results
+
+    def match_tickets(self, chunk_size):
+        """
+        Matches the ticket number masks of each chunk of users against the winning numbers.
+
+        Parameters:
+            chunk_size (int): The number of users matched per chunk.
+
+        Yields:
+            dict: The winning ticket count of each user in the chunk, keyed by match count and user id.
+        """
+        prize_groups = Raffle.PRIZE_GROUPS
+        winning_mask = sum(1 << number for number in self.raffle.winning_numbers)
+        user_number_masks = self.raffle.ticket_store.number_masks
+
+        for start in range(0, len(user_number_masks), chunk_size):
+            group_winners = {match_count: {} for match_count in prize_groups}
+
+            for user_id in range(start, min(start + chunk_size, len(user_number_masks))):
+                for number_mask in user_number_masks[user_id]:
+                    match_count = (number_mask & winning_mask).bit_count()
+                    if match_count in prize_groups:
+                        winners = group_winners[match_count]
+                        winners[user_id] = winners.get(user_id, 0) + 1
+
+            yield group_winners
+
+    def aggregate_payouts(self, matches):
+        """
+        Calculates the payout of each user in each prize group from the matched chunks.
+
+        Parameters:
+            matches (iterable of dict): The matched chunks.
+
+        Yields:
+            tuple: A (group id, user id, winning ticket count, total reward) record per payout.
+        """
+        prize_groups = Raffle.PRIZE_GROUPS
+        group_ids = {match_count: group_id for group_id, match_count in enumerate(Raffle.GROUP_NAMES)}
+
+        if self.winner_counts is not None:
+            rewards_per_ticket = self.get_rewards_per_ticket(self.winner_counts)
+            matched_counts = {match_count: 0 for match_count in prize_groups}
+
+            for chunk in matches:
+                for match_count, winners in chunk.items():
+                    group_id = group_ids[match_count]
+                    reward_per_ticket = rewards_per_ticket[match_count]
+                    for user_id, ticket_count in winners.items():
+                        matched_counts[match_count] += ticket_count
+                        yield group_id, user_id, ticket_count, round(ticket_count * reward_per_ticket, 2)
+
+            expected_counts = {match_count: self.winner_counts.get(match_count, 0) for match_count in prize_groups}
+            if matched_counts != expected_counts:
+                raise InvalidInputException(f"Invalid winner counts. Expected {expected_counts} but matched {matched_counts}.")
+            return
+
+        # Users never span chunks, so merging the chunks' winners cannot overwrite a count
+        group_winners = {match_count: {} for match_count in prize_groups}
+        for chunk in matches:
+            for match_count, winners in chunk.items():
+                group_winners[match_count].update(winners)
+
+        rewards_per_ticket = self.get_rewards_per_ticket(
+            {match_count: sum(winners.values()) for match_count, winners in group_winners.items()}
+        )
+        for match_count, winners in group_winners.items():
+            group_id = group_ids[match_count]
+            reward_per_ticket = rewards_per_ticket[match_count]
+            for user_id, ticket_count in winners.items():
+                yield group_id, user_id, ticket_count, round(ticket_count * reward_per_ticket, 2)
+
+    def get_rewards_per_ticket(self, winner_counts):
+        """
+        Calculates the reward per winning ticket in each prize group.
+
+        Parameters:
+            winner_counts (dict): The number of winning tickets in each prize group, keyed by match count.
+
+        Returns:
+            dict: The reward per winning ticket, keyed by match count.
+        """
+        return {
+            match_count: prize_group.calculate_reward(self.raffle.pot_size, winner_counts.get(match_count, 0))
+            for match_count, prize_group in Raffle.PRIZE_GROUPS.items()
+        }
+
+    def write_payouts(self, payouts, results):
+        """
+        Records each payout in the results and passes it to the payout writer.
+
+        Parameters:
+            payouts (iterable of tuple): The payout records.
+            results (RaffleResults): The results the payouts are recorded in.
+        """
+        group_names = results.group_names
+
+        for group_id, user_id, ticket_count, total_reward in payouts:
+            results.add_winner(group_id, user_id, ticket_count, total_reward)
+            if self.payout_writer is not None:
+                self.payout_writer(group_names[group_id], results.get_user_name(user_id), ticket_count, total_reward)
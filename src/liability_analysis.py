@@ -0,0 +1,134 @@
+from collections import Counter
+from itertools import combinations
+from math import comb
+from src.raffle import Raffle
+
+class LiabilityAnalysis:
+    """
+    Analyses the payout liability of a raffle draw across every possible set of winning numbers.
+    Tickets are reduced to a histogram of number combinations, and the histogram is expanded into
+    counts of every 2 to 5 number subset, so the winners of each outcome are derived from a handful
+    of lookups instead of a settlement run per outcome.
+    """
+
+    NUMBERS = range(1, 16)
+    NUMBERS_PER_TICKET = 5
+    WINNING_COMBINATIONS = list(combinations(NUMBERS, NUMBERS_PER_TICKET))
+
+    def __init__(self, users, pot_size):
+        """
+        Initialises a LiabilityAnalysis instance and analyses every possible winning combination.
+
+        Parameters:
+            users (list of User): The users participating in the draw.
+            pot_size (float): The pot size used to calculate the payouts.
+        """
+        self.pot_size = pot_size
+        self.winning_combinations = LiabilityAnalysis.WINNING_COMBINATIONS
+        self.analyse(Counter(ticket.get_number_mask() for user in users for ticket in user.tickets))
+
+    @classmethod
+    def from_histogram(cls, ticket_histogram, pot_size):
+        """
+        Creates a LiabilityAnalysis instance from a histogram of tickets, e.g. one kept by a LiabilityAggregate.
+
+        Parameters:
+            ticket_histogram (Counter): The number of tickets for each number mask.
+            pot_size (float): The pot size used to calculate the payouts.
+
+        Returns:
+            LiabilityAnalysis: The analysis of every possible winning combination.
+        """
+        analysis = cls.__new__(cls)
+        analysis.pot_size = pot_size
+        analysis.winning_combinations = LiabilityAnalysis.WINNING_COMBINATIONS
+        analysis.analyse(ticket_histogram)
+        return analysis
+
+    @staticmethod
+    def get_subset_masks(mask, subset_size):
+        """
+        Retrieves the bit masks of every subset of a given size of the numbers in a bit mask.
+
+        Parameters:
+            mask (int): The bit mask of the numbers.
+            subset_size (int): The number of numbers in each subset.
+
+        Returns:
+            list of int: The bit masks of the subsets.
+        """
+        bits = [1 << number for number in LiabilityAnalysis.NUMBERS if mask & (1 << number)]
+        return [sum(subset) for subset in combinations(bits, subset_size)]
+
+    def analyse(self, ticket_histogram):
+        """
+        Calculates the number of winning tickets in each prize group and the total payout
+        for every possible winning combination.
+
+        Parameters:
+            ticket_histogram (Counter): The number of tickets for each number mask.
+        """
+        prize_groups = Raffle.PRIZE_GROUPS
+
+        # Number of tickets containing each subset of 2 to 5 numbers
+        subset_counts = Counter()
+        for mask, ticket_count in ticket_histogram.items():
+            for subset_size in prize_groups:
+                for subset_mask in LiabilityAnalysis.get_subset_masks(mask, subset_size):
+                    subset_counts[subset_mask] += ticket_count
+
+        self.winner_counts = []
+        self.payouts = []
+
+        for winning_numbers in self.winning_combinations:
+            winning_mask = sum(1 << number for number in winning_numbers)
+
+            # Tickets containing a subset of size k are counted once per such subset, i.e. C(matches, k)
+            # times, so exact match counts are recovered from the largest group downwards.
+            exact_counts = {}
+            for match_count in sorted(prize_groups, reverse=True):
+                subset_total = sum(subset_counts[subset_mask] for subset_mask in LiabilityAnalysis.get_subset_masks(winning_mask, match_count))
+                for higher_count, winner_count in exact_counts.items():
+                    subset_total -= comb(higher_count, match_count) * winner_count
+                exact_counts[match_count] = subset_total
+
+            winner_counts = {match_count: exact_counts[match_count] for match_count in prize_groups}
+            payout = sum(
+                prize_group.calculate_reward(self.pot_size, 1)
+                for match_count, prize_group in prize_groups.items() if winner_counts[match_count] > 0
+            )
+
+            self.winner_counts.append(winner_counts)
+            self.payouts.append(payout)
+
+    def get_outcome(self, winning_numbers):
+        """
+        Retrieves the winning ticket counts and total payout for a set of winning numbers.
+
+        Parameters:
+            winning_numbers (list of int): The winning numbers.
+
+        Returns:
+            tuple: A tuple containing the winning ticket count per prize group and the total payout.
+        """
+        index = self.winning_combinations.index(tuple(sorted(winning_numbers)))
+        return self.winner_counts[index], self.payouts[index]
+
+    def get_worst_case(self):
+        """
+        Retrieves the winning numbers with the highest total payout.
+
+        Returns:
+            tuple: A tuple containing the winning numbers and the total payout.
+        """
+        index = max(range(len(self.payouts)), key=self.payouts.__getitem__)
+        return list(self.winning_combinations[index]), self.payouts[index]
+
+    def get_expected_payout(self):
+        """
+        Calculates the expected total payout, with every winning combination equally likely.
+
+        Returns:
+            float: The expected total payout.
+        """
+        return sum(self.payouts) / len(self.payouts)
@@ -1,7 +1,16 @@
+import argparse
+from contextlib import nullcontext
 from src.raffle import Raffle
+from src.liability_analysis import LiabilityAnalysis
+from src.draw_close_pipeline import DrawClosePipeline
+from src.consumer.audit_log import AuditLog
+from src.consumer.liability_aggregate import LiabilityAggregate
+from src.profiler import Profiler
 from src.exception.invalid_operation_exception import InvalidOperationException
 from src.exception.invalid_input_exception import InvalidInputException
 
+PROFILED_PHASES = {'2': "purchase", '3': "settlement"}
+
 def display_menu(raffle):
     """
     Displays the main menu of the raffle application and prompt user input.
@@ -14,14 +23,84 @@ def display_menu(raffle):
     print("\n[1] Start a New Draw")
     print("[2] Buy Tickets")
     print("[3] Run Raffle")
+    print("[4] Analyse Liability")
+
+def display_liability(analysis):
+    """
+    Displays the worst-case and expected payouts of the current draw.
+
+    Parameters:
+        analysis (LiabilityAnalysis): The liability analysis of the current draw.
+    """
+    worst_case_numbers, worst_case_payout = analysis.get_worst_case()
+
+    print(f"\nLiability across {len(analysis.payouts)} possible winning tickets:")
+    print(f"Worst-case payout is ${worst_case_payout:.2f} if the winning ticket is {' '.join(map(str, worst_case_numbers))}")
+    print(f"Expected payout is ${analysis.get_expected_payout():.2f}")
+
+def display_payout(group_name, user_name, ticket_count, total_reward):
+    """
+    Displays a winner of the raffle as soon as their payout is settled.
+
+    Parameters:
+        group_name (str): The prize group of the payout.
+        user_name (str): The name of the winning user.
+        ticket_count (int): The number of winning tickets of the user in the group.
+        total_reward (float): The total reward of the user in the group.
+    """
+    print(f"{group_name}: {user_name} with {ticket_count} winning ticket(s) - ${total_reward}")
 
-def handle_menu_choice(raffle, choice):
+def get_winner_counts(raffle, liability_aggregate):
+    """
+    Looks up the number of winning tickets in each prize group for the drawn numbers,
+    so that payouts can be displayed before every ticket has been matched.
+
+    Parameters:
+        raffle (Raffle): The raffle with its winning numbers already generated.
+        liability_aggregate (LiabilityAggregate): The live ticket histogram subscribed to the raffle's purchase stream. Optional.
+
+    Returns:
+        dict: The winning ticket count per prize group, or None if the aggregate does not cover every ticket of the draw.
+    """
+    if liability_aggregate is None:
+        return None
+
+    try:
+        raffle.purchase_stream.poll(liability_aggregate)
+    except InvalidOperationException:
+        return None
+
+    ticket_count = sum(len(number_masks) for number_masks in raffle.ticket_store.number_masks)
+    if sum(liability_aggregate.ticket_histogram.values()) != ticket_count:
+        return None
+
+    winner_counts, _ = liability_aggregate.get_analysis(raffle.pot_size).get_outcome(raffle.winning_numbers)
+    return winner_counts
+
+def profile_phase(profiler, choice):
+    """
+    Profiles the work of a menu choice, excluding its prompts, when profiling is enabled.
+
+    Parameters:
+        profiler (Profiler): The profiler, or None if profiling is disabled.
+        choice (str): The option selected by the user.
+
+    Returns:
+        context manager: The profiled phase of the choice, or a context that does nothing.
+    """
+    if profiler is None:
+        return nullcontext()
+    return profiler.profile_phase(PROFILED_PHASES[choice])
+
+def handle_menu_choice(raffle, choice, profiler=None, liability_aggregate=None):
     """
     Handles the menu choice and perform actions based on the user's selection.
 
     Parameters:
         raffle (Raffle): The raffle instance to interact with.
         choice (str): The option selected by the user.
+        profiler (Profiler): Profiles ticket purchases and settlement when given. Optional.
+        liability_aggregate (LiabilityAggregate): The live ticket histogram subscribed to the raffle's purchase stream. Optional.
     """
     if choice == '1':
         if raffle.is_active:
@@ -41,47 +120,96 @@ def handle_menu_choice(raffle, choice):
                 return
 
             if name and ticket_count:
-                user = raffle.add_user(name)
-                
-                initial_ticket_count = len(user.tickets)
-                user.buy_tickets(ticket_count)
+                with profile_phase(profiler, choice):
+                    user = raffle.add_user(name)
+                    raffle.purchase_tickets(user, ticket_count)
 
                 print("\nPress any key to return to the main menu.")
                 input()
-                
-                new_ticket_count = len(user.tickets) - initial_ticket_count
-                raffle.increase_pot_size(new_ticket_count)
         else:
             raise InvalidOperationException("Raffle draw has not started. Please start a new draw.")
     elif choice == '3':
         if raffle.is_active:
             print("\nRunning Raffle...")
-            raffle.generate_winning_numbers()
-            print(f"Winning Ticket is {' '.join(map(str, raffle.winning_numbers))}\n")
-            raffle.calculate_raffle_results()
-            raffle.display_winners(raffle.raffle_results)
+            with profile_phase(profiler, choice):
+                raffle.generate_winning_numbers()
+                print(f"Winning Ticket is {' '.join(map(str, raffle.winning_numbers))}\n")
+                winner_counts = get_winner_counts(raffle, liability_aggregate)
+                results = DrawClosePipeline(raffle, display_payout, winner_counts).run()
+
+            for group, winners in results.items():
+                if not winners:
+                    print(f"{group}: Nil")
             print("\nPress any key to return to the main menu.")
             input()
             raffle.end_draw()
         else:
             raise InvalidOperationException("Raffle draw has not started. Please start a new draw.")
+    elif choice == '4':
+        if raffle.is_active:
+            if liability_aggregate is None:
+                analysis = LiabilityAnalysis(raffle.users, raffle.pot_size)
+            else:
+                raffle.purchase_stream.poll(liability_aggregate)
+                analysis = liability_aggregate.get_analysis(raffle.pot_size)
+
+            display_liability(analysis)
+            print("\nPress any key to return to the main menu.")
+            input()
+        else:
+            raise InvalidOperationException("Raffle draw has not started. Please start a new draw.")
     else:
         raise InvalidInputException("Invalid choice, please select again.")
     
-def main():
+def parse_arguments(argv=None):
+    """
+    Parses the command line arguments of the raffle application.
+
+    Parameters:
+        argv (list of str): The command line arguments. Defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="My Raffle App")
+    parser.add_argument(
+        "--profile", nargs="?", const="profile", default=None, metavar="DIR",
+        help="profile ticket purchases and settlement, writing reports to DIR (default: profile)"
+    )
+    parser.add_argument(
+        "--audit-log", default=None, metavar="FILE",
+        help="append a record of every ticket purchase to FILE"
+    )
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """
     Main function to control the raffle application flow.
+
+    Parameters:
+        argv (list of str): The command line arguments. Defaults to sys.argv.
     """
+    args = parse_arguments(argv)
+    profiler = Profiler(args.profile) if args.profile else None
+
     raffle = Raffle()
+    liability_aggregate = LiabilityAggregate()
+    raffle.purchase_stream.subscribe(liability_aggregate)
+    if args.audit_log:
+        raffle.purchase_stream.subscribe(AuditLog(args.audit_log))
+
     while True:
         display_menu(raffle)
         choice = input("\nSelect an option: ")
         
         try:
-            handle_menu_choice(raffle, choice)
+            handle_menu_choice(raffle, choice, profiler, liability_aggregate)
         except (InvalidOperationException, InvalidInputException) as e:
             print(e)
             continue
+        finally:
+            if profiler and choice in PROFILED_PHASES:
+                profiler.write_reports()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,166 @@
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+class Profiler:
+    """
+    Records where time and memory go during phases of the raffle, such as ticket purchases and
+    settlement. Each phase is measured with cProfile, a wall-clock stack sampler and tracemalloc,
+    and the measurements accumulate across repeated runs of the same phase.
+    """
+
+    HOT_SPOT_MODULES = ("ticket.py", "user.py", "raffle.py")
+
+    def __init__(self, output_dir, sample_interval=0.001, top_count=10):
+        """
+        Initialises a Profiler instance with no recorded phases.
+
+        Parameters:
+            output_dir (str): The directory the profiling reports are written to.
+            sample_interval (float): The number of seconds between stack samples.
+            top_count (int): The number of hot spots and allocation sites listed in the summary.
+        """
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.top_count = top_count
+        self.profiles = {}
+        self.stack_samples = {}
+        self.allocations = {}
+
+    @contextmanager
+    def profile_phase(self, phase):
+        """
+        Profiles the code run inside the context as part of a phase.
+
+        Parameters:
+            phase (str): The name of the phase, e.g. "purchase" or "settlement".
+        """
+        profile = self.profiles.setdefault(phase, cProfile.Profile())
+        stack_samples = self.stack_samples.setdefault(phase, Counter())
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        snapshot_before = tracemalloc.take_snapshot()
+
+        stop_sampling = threading.Event()
+        sampler = threading.Thread(
+            target=self.sample_stacks,
+            args=(threading.get_ident(), stack_samples, stop_sampling),
+            daemon=True
+        )
+        sampler.start()
+        profile.enable()
+
+        try:
+            yield
+        finally:
+            profile.disable()
+            stop_sampling.set()
+            sampler.join()
+
+            snapshot_after = tracemalloc.take_snapshot()
+            if started_tracing:
+                tracemalloc.stop()
+            self.record_allocations(phase, snapshot_before, snapshot_after)
+
+    def sample_stacks(self, thread_id, stack_samples, stop_sampling):
+        """
+        Samples the call stack of a thread until stopped, counting each stack in collapsed form.
+
+        Parameters:
+            thread_id (int): The id of the thread to sample.
+            stack_samples (Counter): The counts of each collapsed stack.
+            stop_sampling (threading.Event): The event signalling the sampler to stop.
+        """
+        while not stop_sampling.wait(self.sample_interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+
+            while frame is not None:
+                code = frame.f_code
+                if code.co_filename != __file__:
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+
+            if stack:
+                stack_samples[";".join(reversed(stack))] += 1
+
+    def record_allocations(self, phase, snapshot_before, snapshot_after):
+        """
+        Adds the memory allocated between two snapshots to the allocations of a phase.
+
+        Parameters:
+            phase (str): The name of the phase.
+            snapshot_before (tracemalloc.Snapshot): The snapshot taken when the phase started.
+            snapshot_after (tracemalloc.Snapshot): The snapshot taken when the phase ended.
+        """
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, threading.__file__),
+            tracemalloc.Filter(False, __file__)
+        ]
+        allocations = self.allocations.setdefault(phase, Counter())
+
+        for stat in snapshot_after.filter_traces(filters).compare_to(snapshot_before.filter_traces(filters), "lineno"):
+            if stat.size_diff > 0:
+                frame = stat.traceback[0]
+                allocations[f"{frame.filename}:{frame.lineno}"] += stat.size_diff
+
+    def get_hot_spots(self, phase):
+        """
+        Retrieves the functions of Ticket, User and Raffle with the highest cumulative time in a phase.
+
+        Parameters:
+            phase (str): The name of the phase.
+
+        Returns:
+            list of tuple: Tuples containing the function label, call count, own time and cumulative time.
+        """
+        stats = pstats.Stats(self.profiles[phase]).stats
+        hot_spots = [
+            (f"{os.path.basename(filename)}:{lineno}({function_name})", call_count, own_time, cumulative_time)
+            for (filename, lineno, function_name), (_, call_count, own_time, cumulative_time, _) in stats.items()
+            if os.path.basename(filename) in Profiler.HOT_SPOT_MODULES
+        ]
+        return sorted(hot_spots, key=lambda hot_spot: hot_spot[3], reverse=True)[:self.top_count]
+
+    def write_reports(self):
+        """
+        Writes the reports of every recorded phase to the output directory: a <phase>.prof cProfile
+        dump, a <phase>.folded collapsed stack file for flamegraph tools, and a summary.txt listing
+        the top hot spots and allocation sites.
+
+        Returns:
+            str: The path of the summary file.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        summary_lines = []
+
+        for phase, profile in self.profiles.items():
+            profile.dump_stats(os.path.join(self.output_dir, f"{phase}.prof"))
+
+            with open(os.path.join(self.output_dir, f"{phase}.folded"), "w") as folded_file:
+                for stack, sample_count in self.stack_samples[phase].items():
+                    folded_file.write(f"{stack} {sample_count}\n")
+
+            summary_lines.append(f"Phase: {phase}")
+            summary_lines.append("Top hot spots in Ticket, User and Raffle:")
+            for label, call_count, own_time, cumulative_time in self.get_hot_spots(phase):
+                summary_lines.append(f"  {label} calls={call_count} own={own_time:.6f}s cumulative={cumulative_time:.6f}s")
+
+            summary_lines.append("Top allocation sites:")
+            for location, size in self.allocations[phase].most_common(self.top_count):
+                summary_lines.append(f"  {location} {size / 1024:.1f} KiB")
+            summary_lines.append("")
+
+        summary_path = os.path.join(self.output_dir, "summary.txt")
+        with open(summary_path, "w") as summary_file:
+            summary_file.write("\n".join(summary_lines))
+
+        return summary_path
@@ -0,0 +1,17 @@
+class PurchaseEvent:
+    """
+    Represents a ticket purchase published to the purchase stream.
+    """
+
+    def __init__(self, sequence, user_name, ticket_numbers):
+        """
+        Initialises a PurchaseEvent instance with its position in the stream and the tickets purchased.
+
+        Parameters:
+            sequence (int): The position of the event in the purchase stream.
+            user_name (str): The name of the user who purchased the tickets.
+            ticket_numbers (list of list of int): The numbers of each ticket purchased.
+        """
+        self.sequence = sequence
+        self.user_name = user_name
+        self.ticket_numbers = ticket_numbers
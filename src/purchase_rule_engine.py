@@ -0,0 +1,165 @@
+from src.user import User
+from src.exception.invalid_input_exception import InvalidInputException
+
+class PurchaseRuleEngine:
+    """
+    Validates batches of ticket purchase requests against a set of purchase rules.
+    Rules are given as data, e.g. {"scope": "user", "limit": 5} or {"scope": "draw", "limit": 1000},
+    optionally restricted to some users with "users": [...] (a limit of 0 blocks them). The rules
+    are compiled once into quota limits and counters, so each request is checked in constant time
+    without creating or inspecting any Ticket objects. Each decision reports the rule that limited
+    the request, so callers can explain why a purchase was clipped or rejected.
+    """
+
+    ACCEPT = "accept"
+    CLIP = "clip"
+    REJECT = "reject"
+
+    SCOPES = ("user", "draw")
+    DEFAULT_RULES = [{"scope": "user", "limit": User.MAX_TICKETS}]
+
+    def __init__(self, rules=None):
+        """
+        Initialises a PurchaseRuleEngine instance with the purchase rules and empty quota counters.
+
+        Parameters:
+            rules (list of dict): The purchase rules. Defaults to the per-user limit of User.MAX_TICKETS.
+        """
+        self.rules = list(PurchaseRuleEngine.DEFAULT_RULES if rules is None else rules)
+        self.compile_rules()
+        self.user_ticket_counts = {}
+        self.total_ticket_count = 0
+
+    def compile_rules(self):
+        """
+        Compiles the purchase rules into a default per-user limit, per-user limits for the users
+        named by rules, and a limit on the total number of tickets in the draw.
+        """
+        self.user_limit = None
+        self.user_limits = {}
+        self.draw_limit = None
+        self.user_rule = None
+        self.user_rules = {}
+        self.draw_rule = None
+
+        for rule in self.rules:
+            scope = rule.get("scope")
+            limit = rule.get("limit")
+
+            if scope not in PurchaseRuleEngine.SCOPES:
+                raise InvalidInputException(f"Invalid purchase rule. Scope must be one of {', '.join(PurchaseRuleEngine.SCOPES)}.")
+
+            if not isinstance(limit, int) or limit < 0:
+                raise InvalidInputException("Invalid purchase rule. Limit must be a non-negative integer.")
+
+            if scope == "draw":
+                if self.draw_limit is None or limit < self.draw_limit:
+                    self.draw_limit, self.draw_rule = limit, rule
+            elif "users" in rule:
+                for name in rule["users"]:
+                    if name not in self.user_limits or limit < self.user_limits[name]:
+                        self.user_limits[name], self.user_rules[name] = limit, rule
+            else:
+                if self.user_limit is None or limit < self.user_limit:
+                    self.user_limit, self.user_rule = limit, rule
+
+    def load_users(self, users):
+        """
+        Seeds the quota counters with the tickets already held by existing users.
+
+        Parameters:
+            users (list of User): The users currently participating in the draw.
+        """
+        for user in users:
+            ticket_count = len(user.tickets)
+            self.user_ticket_counts[user.name] = self.user_ticket_counts.get(user.name, 0) + ticket_count
+            self.total_ticket_count += ticket_count
+
+    def get_remaining_allowance(self, name):
+        """
+        Retrieves the number of tickets a user can still purchase under all rules.
+
+        Parameters:
+            name (str): The name of the user.
+
+        Returns:
+            int: The number of tickets the user can still purchase, or None if no rule limits the user.
+        """
+        return self.get_limiting_rule(name)[0]
+
+    def get_limiting_rule(self, name):
+        """
+        Retrieves the rule that leaves a user the fewest tickets to purchase. Rules naming the
+        user come before the default per-user limit, which comes before the draw limit.
+
+        Parameters:
+            name (str): The name of the user.
+
+        Returns:
+            tuple: A tuple containing the number of tickets the user can still purchase and the
+            limiting rule, or (None, None) if no rule limits the user.
+        """
+        user_ticket_count = self.user_ticket_counts.get(name, 0)
+        remaining_allowances = []
+
+        if name in self.user_limits:
+            remaining_allowances.append((self.user_limits[name] - user_ticket_count, self.user_rules[name]))
+
+        if self.user_limit is not None:
+            remaining_allowances.append((self.user_limit - user_ticket_count, self.user_rule))
+
+        if self.draw_limit is not None:
+            remaining_allowances.append((self.draw_limit - self.total_ticket_count, self.draw_rule))
+
+        if not remaining_allowances:
+            return None, None
+
+        remaining_tickets, rule = min(remaining_allowances, key=lambda allowance: allowance[0])
+        return max(0, remaining_tickets), rule
+
+    def evaluate(self, purchase_requests):
+        """
+        Evaluates a batch of purchase requests in order and updates the quota counters
+        for the tickets granted.
+
+        Parameters:
+            purchase_requests (list of tuple): Tuples containing the user's name and requested ticket count.
+
+        Returns:
+            list of tuple: A tuple per request containing the decision (accept, clip or reject),
+            the number of tickets granted and the rule that clipped or rejected the request
+            (None if the request was accepted or asked for no tickets).
+        """
+        decisions = []
+        user_ticket_counts = self.user_ticket_counts
+
+        for name, ticket_count in purchase_requests:
+            if ticket_count <= 0:
+                decisions.append((PurchaseRuleEngine.REJECT, 0, None))
+                continue
+
+            remaining_tickets, rule = self.get_limiting_rule(name)
+
+            if remaining_tickets == 0:
+                decisions.append((PurchaseRuleEngine.REJECT, 0, rule))
+                continue
+
+            if remaining_tickets is not None and ticket_count > remaining_tickets:
+                decision = PurchaseRuleEngine.CLIP
+                ticket_count = remaining_tickets
+            else:
+                decision = PurchaseRuleEngine.ACCEPT
+                rule = None
+
+            user_ticket_counts[name] = user_ticket_counts.get(name, 0) + ticket_count
+            self.total_ticket_count += ticket_count
+            decisions.append((decision, ticket_count, rule))
+
+        return decisions
+
+    def reset(self):
+        """
+        Resets the quota counters for a new draw while keeping the purchase rules.
+        """
+        self.user_ticket_counts = {}
+        self.total_ticket_count = 0
@@ -0,0 +1,146 @@
+from src.purchase_event import PurchaseEvent
+from src.exception.invalid_operation_exception import InvalidOperationException
+
+class PurchaseStream:
+    """
+    Represents an in-process stream of ticket purchases held in a fixed size ring buffer.
+    Publishing a purchase only stores the event, and each subscribed consumer reads the
+    events in batches at its own pace. Publishing never delivers events; catch_up() delivers
+    a batch to each consumer with enough unread events, so consumers polled through it never
+    fall a full ring buffer behind. A consumer that does fall behind is reported when it is
+    next polled. Retained events can be replayed to a consumer from one of its checkpoints.
+    """
+
+    def __init__(self, capacity=1024, batch_size=None):
+        """
+        Initialises a PurchaseStream instance with an empty ring buffer and no consumers.
+
+        Parameters:
+            capacity (int): The number of events retained in the ring buffer.
+            batch_size (int): The number of unread events at which catch_up() polls a consumer. Defaults to a quarter of the capacity.
+        """
+        self.capacity = capacity
+        self.batch_size = batch_size or max(1, capacity // 4)
+        self.events = [None] * capacity
+        self.first_sequence = 0
+        self.next_sequence = 0
+        self.consumers = []
+
+    def get_oldest_sequence(self):
+        """
+        Retrieves the sequence of the oldest event still retained in the ring buffer.
+
+        Returns:
+            int: The sequence of the oldest retained event.
+        """
+        return max(self.first_sequence, self.next_sequence - self.capacity)
+
+    def subscribe(self, consumer, checkpoint=None):
+        """
+        Subscribes a consumer to the stream.
+
+        Parameters:
+            consumer (PurchaseConsumer): The consumer to subscribe.
+            checkpoint (int): The sequence the consumer starts reading from. Defaults to the next event published.
+        """
+        consumer.position = self.next_sequence if checkpoint is None else checkpoint
+        self.consumers.append(consumer)
+
+    def publish(self, user_name, ticket_numbers):
+        """
+        Publishes a ticket purchase to the stream without delivering it to any consumer.
+
+        Parameters:
+            user_name (str): The name of the user who purchased the tickets.
+            ticket_numbers (list of list of int): The numbers of each ticket purchased.
+
+        Returns:
+            PurchaseEvent: The published event.
+        """
+        event = PurchaseEvent(self.next_sequence, user_name, ticket_numbers)
+        self.events[self.next_sequence % self.capacity] = event
+        self.next_sequence += 1
+        return event
+
+    def poll(self, consumer):
+        """
+        Delivers every event the consumer has not read yet as a single batch.
+
+        Parameters:
+            consumer (PurchaseConsumer): The consumer to deliver events to.
+
+        Returns:
+            int: The number of events delivered.
+        """
+        if consumer.position < self.get_oldest_sequence():
+            raise InvalidOperationException(
+                f"{type(consumer).__name__} has fallen behind. Purchase events before #{self.get_oldest_sequence()} are no longer retained."
+            )
+
+        batch = [self.events[sequence % self.capacity] for sequence in range(consumer.position, self.next_sequence)]
+        if batch:
+            consumer.consume_batch(batch)
+            consumer.position = self.next_sequence
+
+        return len(batch)
+
+    def catch_up(self):
+        """
+        Delivers a batch to every consumer with at least batch_size unread events. Consumers
+        that have already fallen behind are left to be reported by drain().
+        """
+        oldest_sequence = self.get_oldest_sequence()
+
+        for consumer in self.consumers:
+            if consumer.position >= oldest_sequence and self.next_sequence - consumer.position >= self.batch_size:
+                self.poll(consumer)
+
+    def drain(self):
+        """
+        Delivers every unread event to every subscribed consumer. Consumers that have fallen
+        too far behind do not hold back the others.
+
+        Returns:
+            list of InvalidOperationException: An error for each consumer that has fallen too far behind.
+        """
+        errors = []
+
+        for consumer in self.consumers:
+            try:
+                self.poll(consumer)
+            except InvalidOperationException as e:
+                errors.append(e)
+
+        return errors
+
+    def replay(self, consumer, checkpoint):
+        """
+        Restores a consumer to a checkpoint and delivers the events from there again.
+
+        Parameters:
+            consumer (PurchaseConsumer): The consumer to replay events to.
+            checkpoint (tuple): The position and state captured by the consumer's checkpoint() method.
+
+        Returns:
+            int: The number of events delivered.
+        """
+        position, state = checkpoint
+
+        if position < self.get_oldest_sequence():
+            raise InvalidOperationException(f"Purchase events before #{self.get_oldest_sequence()} are no longer retained.")
+
+        consumer.restore_state(state)
+        consumer.position = position
+        return self.poll(consumer)
+
+    def reset(self):
+        """
+        Starts the stream of a new draw. Events of the previous draw are no longer retained,
+        and every consumer continues from the next event published.
+        """
+        self.events = [None] * self.capacity
+        self.first_sequence = self.next_sequence
+
+        for consumer in self.consumers:
+            consumer.position = self.next_sequence
+            consumer.reset()
@@ -1,22 +1,46 @@
 import random
 from src.user import User
 from src.prize_group import PrizeGroup
+from src.raffle_results import RaffleResults
+from src.purchase_rule_engine import PurchaseRuleEngine
+from src.purchase_stream import PurchaseStream
+from src.consumer.pot_counter import PotCounter
+from src.consumer.ticket_store import TicketStore
 from src.exception.invalid_input_exception import InvalidInputException
 
 class Raffle:
     """
     Represents a raffle draw with a pot size, list of users, winning numbers,
     """
+
+    PRIZE_GROUPS = {
+        2: PrizeGroup(2, 10),  # 2 matches = 10% of pot
+        3: PrizeGroup(3, 15),  # 3 matches = 15% of pot
+        4: PrizeGroup(4, 25),  # 4 matches = 25% of pot
+        5: PrizeGroup(5, 50)   # 5 matches = 50% of pot (Jackpot)
+    }
+
+    GROUP_NAMES = {2: "Group 2", 3: "Group 3", 4: "Group 4", 5: "Group 5 (Jackpot)"}
+
     def __init__(self):
         """
         Initialises a Raffle instance with default values for pot size, user list,
-        winning numbers, draw status, and raffle results.
+        user ids, winning numbers, draw status, raffle results and purchase rules,
+        and a purchase stream whose ticket store adds purchased tickets to the users
+        and whose pot counter adds ticket sales to the pot.
         """
         self.pot_size = 0
         self.users = []
+        self.user_ids = {}
         self.winning_numbers = []
         self.is_active = False
         self.raffle_results = {}
+        self.purchase_rules = PurchaseRuleEngine()
+        self.purchase_stream = PurchaseStream()
+        self.ticket_store = TicketStore(self)
+        self.pot_counter = PotCounter(self)
+        self.purchase_stream.subscribe(self.ticket_store)
+        self.purchase_stream.subscribe(self.pot_counter)
 
     def get_draw_status(self):
         """
@@ -41,7 +65,8 @@ class Raffle:
 
     def get_user_by_name(self, name):
         """
-        Retrieves a user by their name.
+        Retrieves a user by their name. A user's id is their position in the user list,
+        recorded when the user is added with add_user() or load_users().
 
         Parameters:
             name (str): The name of the user.
@@ -49,10 +74,8 @@ class Raffle:
         Returns:
             User: The user instance if found, otherwise None.
         """
-        for user in self.users:
-            if user.name == name:
-                return user
-        return None
+        user_id = self.user_ids.get(name)
+        return None if user_id is None else self.users[user_id]
 
     def verify_buy_tickets_input(self, name_and_ticket_count):
         """
@@ -91,10 +114,97 @@ class Raffle:
         
         if user is None:
             user = User(name)
+            self.user_ids[name] = len(self.users)
             self.users.append(user)
 
         return user 
 
+    def purchase_tickets(self, user, ticket_count):
+        """
+        Validates a ticket purchase against the purchase rules, generates the tickets granted
+        and publishes the purchase. The tickets are added to the user by the ticket store.
+
+        Parameters:
+            user (User): The user purchasing tickets.
+            ticket_count (int): The number of tickets the user wants to purchase.
+
+        Returns:
+            list of Ticket: The tickets generated.
+        """
+        decision, granted_count, rule = self.purchase_rules.evaluate([(user.name, ticket_count)])[0]
+
+        if decision == PurchaseRuleEngine.REJECT:
+            print(self.get_rejection_message(user.name, rule))
+            return []
+
+        if decision == PurchaseRuleEngine.CLIP:
+            print(f"{user.name} requested {ticket_count} tickets, but only {granted_count} more ticket(s) can be purchased.")
+
+        new_tickets = user.generate_tickets(granted_count)
+        self.record_purchase(user.name, [ticket.numbers for ticket in new_tickets])
+        return new_tickets
+
+    def get_rejection_message(self, name, rule):
+        """
+        Explains why a purchase was rejected by a purchase rule.
+
+        Parameters:
+            name (str): The name of the user.
+            rule (dict): The purchase rule that rejected the purchase, or None.
+
+        Returns:
+            str: The message shown to the user.
+        """
+        if rule is None:
+            return f"{name} cannot purchase any more tickets."
+
+        if rule["scope"] == "draw":
+            return f"The draw has sold the maximum of {rule['limit']} tickets, so {name} cannot buy more."
+
+        if rule["limit"] == 0:
+            return f"{name} is not allowed to purchase tickets."
+
+        return f"{name} has already purchased the maximum of {rule['limit']} tickets and cannot buy more."
+
+    def load_users(self, users):
+        """
+        Adds users who already hold tickets, e.g. restored from elsewhere, and counts their
+        tickets against the purchase rules. Tickets bought through purchase_tickets() are
+        counted as they are purchased.
+
+        Parameters:
+            users (list of User): The users to add.
+        """
+        for user in users:
+            self.user_ids[user.name] = len(self.users)
+            self.users.append(user)
+
+        self.ticket_store.load_users(users)
+        self.purchase_rules.load_users(users)
+
+    def record_purchase(self, user_name, ticket_numbers):
+        """
+        Publishes a ticket purchase to the purchase stream and brings the users' tickets and
+        the pot up to date. Any other subscribed consumers are polled in batches, so they
+        never fall a full ring buffer behind.
+
+        Parameters:
+            user_name (str): The name of the user who purchased the tickets.
+            ticket_numbers (list of list of int): The numbers of each ticket purchased.
+        """
+        if ticket_numbers:
+            self.purchase_stream.publish(user_name, ticket_numbers)
+            self.apply_purchases()
+            self.purchase_stream.catch_up()
+
+    def apply_purchases(self):
+        """
+        Delivers unread purchases to the ticket store and pot counter, which settlement depends on.
+        Optional consumers such as an audit log are not polled.
+        """
+        self.purchase_stream.poll(self.ticket_store)
+        self.purchase_stream.poll(self.pot_counter)
+
     def increase_pot_size(self, ticket_count):
         """
         Increases the pot size by adding the total value of tickets purchased.
@@ -116,38 +226,32 @@ class Raffle:
         Calculates the results of the raffle by determining winning tickets
         based on matching numbers. Distribute rewards according to prize groups.
         """
-        rewards = {"Group 2": {}, "Group 3": {}, "Group 4": {}, "Group 5 (Jackpot)": {}}
-        prize_groups = {
-            2: PrizeGroup(2, 10),  # 2 matches = 10% of pot
-            3: PrizeGroup(3, 15),  # 3 matches = 15% of pot
-            4: PrizeGroup(4, 25),  # 4 matches = 25% of pot
-            5: PrizeGroup(5, 50)   # 5 matches = 50% of pot (Jackpot)
-        }
+        self.apply_purchases()
+
+        prize_groups = Raffle.PRIZE_GROUPS
+        rewards = RaffleResults(Raffle.GROUP_NAMES.values(), self.users)
 
-        group_winner_counts = {2: {}, 3: {}, 4: {}, 5: {}}
+        group_winner_counts = {match_count: {} for match_count in prize_groups}
+        winning_mask = sum(1 << number for number in self.winning_numbers)
 
-        # Count matches for each user's tickets
-        for user in self.users:
-            for ticket in user.tickets:
-                match_count = ticket.count_matching_numbers(self.winning_numbers)
+        # Count matches for each user's ticket number masks, keyed by user id
+        for user_id, number_masks in enumerate(self.ticket_store.number_masks):
+            for number_mask in number_masks:
+                match_count = (number_mask & winning_mask).bit_count()
                 if match_count in prize_groups:
-                    if user.name in group_winner_counts[match_count]:
-                        group_winner_counts[match_count][user.name]['count'] += 1
-                    else:
-                        group_winner_counts[match_count][user.name] = {'count': 1}
+                    winners = group_winner_counts[match_count]
+                    winners[user_id] = winners.get(user_id, 0) + 1
 
         # Calculate rewards for each prize group
-        for match_count, winners in group_winner_counts.items():
-            group_name = f"Group {match_count}"
-            winner_count = sum(winner_data['count'] for winner_data in winners.values())  # Total number of winning tickets in the group
+        for group_id, (match_count, winners) in enumerate(group_winner_counts.items()):
+            winner_count = sum(winners.values())  # Total number of winning tickets in the group
 
             if winner_count > 0:
                 reward_per_ticket = prize_groups[match_count].calculate_reward(self.pot_size, winner_count)
 
-                for user_name, data in winners.items():
-                    ticket_count = data['count']
+                for user_id, ticket_count in winners.items():
                     total_reward = round(ticket_count * reward_per_ticket, 2)
-                    rewards[group_name][user_name] = {'count': ticket_count, 'total_reward': total_reward}
+                    rewards.add_winner(group_id, user_id, ticket_count, total_reward)
 
         self.raffle_results = rewards
 
@@ -156,7 +260,7 @@ class Raffle:
         Displays the winners of the raffle for each prize group.
 
         Parameters:
-            rewards (dict): Dictionary of rewards for each prize group and user.
+            rewards (RaffleResults or dict): Rewards for each prize group and user.
         """
         for group, winners in rewards.items():
             print(f"\n{group} Winners:")
@@ -174,25 +278,36 @@ class Raffle:
         Calculates the total amount of winnings to be distributed.
 
         Parameters:
-            rewards (dict): Dictionary of rewards for each prize group and user.
+            rewards (RaffleResults or dict): Rewards for each prize group and user.
 
         Returns:
             float: Total winnings to be deducted from the pot.
         """
+        if isinstance(rewards, RaffleResults):
+            return rewards.get_total_winnings()
+
         return sum(data['total_reward'] for group_rewards in rewards.values() for data in group_rewards.values())
 
     def reset_draw(self):
         """
-        Resets the draw by clearing users, winning numbers, and setting the draw as inactive.
+        Resets the draw by clearing users, winning numbers and purchase events, and setting the draw as inactive.
         """
         self.is_active = False
         self.users = []
+        self.user_ids = {}
         self.winning_numbers = []
+        self.purchase_rules.reset()
+        self.purchase_stream.reset()
 
     def end_draw(self):
         """
         Ends the current raffle draw, distribute winnings, and reset for the next round.
+        Optional consumers that have fallen behind are reported without stopping the draw from ending.
         """
+        self.apply_purchases()
+        for error in self.purchase_stream.drain():
+            print(error)
+
         total_winnings = self.calculate_total_winnings(self.raffle_results)
         self.pot_size = max(0, self.pot_size - total_winnings)
         self.reset_draw()
@@ -0,0 +1,109 @@
+from array import array
+from collections.abc import Mapping
+
+class RaffleResults(Mapping):
+    """
+    Represents the results of a raffle draw. The winners of each prize group are stored as rows
+    across parallel arrays of user id, winning ticket count and payout in cents, with the total
+    payout of each prize group kept as rows are added. User names are only resolved when a prize
+    group is read like the nested dictionary {group_name: {user_name: {'count': ..., 'total_reward': ...}}}
+    used by existing callers, and each prize group is resolved once until more winners are added.
+    """
+
+    def __init__(self, group_names, users):
+        """
+        Initialises a RaffleResults instance with no winners.
+
+        Parameters:
+            group_names (list of str): The names of the prize groups, indexed by prize group id.
+            users (list of User): The users of the draw, indexed by user id.
+        """
+        self.group_names = list(group_names)
+        self.group_ids = {group_name: group_id for group_id, group_name in enumerate(self.group_names)}
+        self.users = users
+        self.user_ids = [array('l') for _ in self.group_names]
+        self.winning_counts = [array('l') for _ in self.group_names]
+        self.payout_cents = [array('q') for _ in self.group_names]
+        self.group_winners = [None] * len(self.group_names)
+        self.group_total_cents = [0] * len(self.group_names)
+        self.total_cents = 0
+
+    def add_winner(self, group_id, user_id, winning_count, total_reward):
+        """
+        Records a winner in a prize group.
+
+        Parameters:
+            group_id (int): The id of the prize group.
+            user_id (int): The id of the winning user.
+            winning_count (int): The number of winning tickets the user holds in the prize group.
+            total_reward (float): The total reward of the user in the prize group.
+        """
+        cents = round(total_reward * 100)
+
+        self.user_ids[group_id].append(user_id)
+        self.winning_counts[group_id].append(winning_count)
+        self.payout_cents[group_id].append(cents)
+        self.group_winners[group_id] = None
+        self.group_total_cents[group_id] += cents
+        self.total_cents += cents
+
+    def get_user_name(self, user_id):
+        """
+        Resolves the name of a user in the results.
+
+        Parameters:
+            user_id (int): The id of the user.
+
+        Returns:
+            str: The name of the user.
+        """
+        return self.users[user_id].name
+
+    def get_group_total(self, group_name):
+        """
+        Retrieves the total payout of a prize group.
+
+        Parameters:
+            group_name (str): The name of the prize group.
+
+        Returns:
+            float: The total payout of the prize group.
+        """
+        return self.group_total_cents[self.group_ids[group_name]] / 100
+
+    def get_total_winnings(self):
+        """
+        Retrieves the total payout across all prize groups.
+
+        Returns:
+            float: The total winnings to be deducted from the pot.
+        """
+        return self.total_cents / 100
+
+    def __getitem__(self, group_name):
+        """
+        Retrieves the winners of a prize group as a dictionary.
+
+        Parameters:
+            group_name (str): The name of the prize group.
+
+        Returns:
+            dict: Dictionary of the winning ticket count and total reward for each user.
+        """
+        group_id = self.group_ids[group_name]
+
+        if self.group_winners[group_id] is None:
+            self.group_winners[group_id] = {
+                self.get_user_name(user_id): {'count': winning_count, 'total_reward': cents / 100}
+                for user_id, winning_count, cents in zip(
+                    self.user_ids[group_id], self.winning_counts[group_id], self.payout_cents[group_id]
+                )
+            }
+
+        return self.group_winners[group_id]
+
+    def __iter__(self):
+        return iter(self.group_names)
+
+    def __len__(self):
+        return len(self.group_names)
@@ -5,12 +5,15 @@ class Ticket:
     Represents a raffle ticket with a unique set of randomly generated numbers.
     Each ticket contains five numbers between 1 and 15.
     """
-    def __init__(self):
+    def __init__(self, numbers=None):
         """
         Initialises a Ticket instance with five unique random numbers
         between 1 and 15, sorted in ascending order.
+
+        Parameters:
+            numbers (list of int): The numbers of a ticket already drawn, e.g. from a purchase event. Optional.
         """
-        self.numbers = sorted(random.sample(range(1, 16), 5))
+        self.numbers = sorted(random.sample(range(1, 16), 5)) if numbers is None else list(numbers)
 
     def count_matching_numbers(self, winning_numbers):
         """
@@ -24,6 +27,18 @@ class Ticket:
         """
         return len(set(self.numbers) & set(winning_numbers))
 
+    def get_number_mask(self):
+        """
+        Encodes the numbers on the ticket as a bit mask, with bit n set for number n.
+
+        Returns:
+            int: The bit mask of the numbers on the ticket.
+        """
+        mask = 0
+        for number in self.numbers:
+            mask |= 1 << number
+        return mask
+
     def display_numbers(self):
         """
         Displays the numbers on the ticket as a formatted string.
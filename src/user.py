@@ -20,6 +20,9 @@ class User:
     def buy_tickets(self, ticket_count):
         """
         Allows the user to purchase raffle tickets, limited to the maximum ticket count.
+        This is the standalone purchase path for a user outside a raffle. Raffle purchases
+        go through Raffle.purchase_tickets(), where the PurchaseRuleEngine applies every
+        purchase rule, including this per-user limit.
 
         Parameters:
             ticket_count (int): The number of tickets the user wants to purchase.
@@ -36,10 +39,26 @@ class User:
             print(f"{self.name} requested {ticket_count} tickets, but only {remaining_tickets} more ticket(s) can be purchased.")
             ticket_count = remaining_tickets
 
+        self.tickets.extend(self.generate_tickets(ticket_count))
+
+    def generate_tickets(self, ticket_count):
+        """
+        Generates and displays raffle tickets for the user without checking any purchase limit
+        or adding them to the user's tickets. Raffle purchases are added by the raffle's ticket store.
+
+        Parameters:
+            ticket_count (int): The number of tickets to generate.
+
+        Returns:
+            list of Ticket: The tickets generated.
+        """
         print(f"\nHi {self.name}, you are purchasing {ticket_count} ticket(s).")
-        
+
         # Generate and display each ticket purchased
+        new_tickets = []
         for i in range(ticket_count):
             ticket = Ticket()
-            self.tickets.append(ticket)
-            print(f"Ticket {i + 1}: {ticket.display_numbers()}")
\ No newline at end of file
+            new_tickets.append(ticket)
+            print(f"Ticket {i + 1}: {ticket.display_numbers()}")
+
+        return new_tickets
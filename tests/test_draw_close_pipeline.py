@@ -0,0 +1,142 @@
+import pytest
+from unittest.mock import MagicMock
+from src.draw_close_pipeline import DrawClosePipeline
+from src.raffle import Raffle
+from src.ticket import Ticket
+from src.user import User
+from src.exception.invalid_input_exception import InvalidInputException
+
+def create_raffle():
+    """Creates a raffle with fixed tickets and winning numbers"""
+    raffle = Raffle()
+    raffle.pot_size = 1000
+    raffle.winning_numbers = [1, 2, 3, 4, 5]
+
+    for name, ticket_numbers in [
+        ("Alice", [[1, 2, 3, 4, 5], [1, 2, 10, 11, 12]]),
+        ("Bob", [[1, 2, 3, 13, 14], [1, 2, 6, 7, 8]]),
+        ("Charlie", [[11, 12, 13, 14, 15]])
+    ]:
+        user = User(name)
+        for numbers in ticket_numbers:
+            ticket = Ticket()
+            ticket.numbers = numbers
+            user.tickets.append(ticket)
+        raffle.load_users([user])
+
+    return raffle
+
+def test_run_matches_calculate_raffle_results():
+    """Tests that the run method produces the same results as the calculate_raffle_results method"""
+    raffle = create_raffle()
+    raffle.calculate_raffle_results()
+    expected_results = dict(raffle.raffle_results)
+
+    results = DrawClosePipeline(raffle, chunk_size=1).run()
+
+    assert raffle.raffle_results is results
+    assert results == expected_results
+    assert results.get_total_winnings() == 750
+
+def test_run_writes_payouts():
+    """Tests that the run method passes every payout to the payout writer"""
+    raffle = create_raffle()
+    payout_writer = MagicMock()
+
+    DrawClosePipeline(raffle, payout_writer=payout_writer).run()
+
+    written_payouts = sorted(call.args for call in payout_writer.call_args_list)
+    assert written_payouts == [
+        ("Group 2", "Alice", 1, 50.0),
+        ("Group 2", "Bob", 1, 50.0),
+        ("Group 3", "Bob", 1, 150.0),
+        ("Group 5 (Jackpot)", "Alice", 1, 500.0)
+    ]
+
+def test_run_with_known_winner_counts():
+    """Tests that the run method produces the same results when the winner counts are given up front"""
+    raffle = create_raffle()
+    raffle.calculate_raffle_results()
+    expected_results = dict(raffle.raffle_results)
+
+    results = DrawClosePipeline(raffle, winner_counts={2: 2, 3: 1, 4: 0, 5: 1}, chunk_size=1).run()
+
+    assert results == expected_results
+
+def test_run_drains_purchase_stream():
+    """Tests that the run method applies pending purchases to the pot before settling"""
+    raffle = create_raffle()
+    raffle.record_purchase("Charlie", [[11, 12, 13, 14, 15]] * 20)
+
+    results = DrawClosePipeline(raffle).run()
+
+    assert raffle.pot_size == 1100
+    assert results["Group 5 (Jackpot)"]["Alice"]["total_reward"] == 550.0
+
+def test_run_raises_stage_error():
+    """Tests that the run method raises an error from a pipeline stage"""
+    raffle = create_raffle()
+    raffle.winning_numbers = None
+
+    with pytest.raises(TypeError):
+        DrawClosePipeline(raffle).run()
+
+    assert raffle.raffle_results == {}
+
+def test_run_rejects_wrong_winner_counts():
+    """Tests that the run method raises an exception when the given winner counts do not match the matched tickets"""
+    raffle = create_raffle()
+    raffle.winning_numbers = [11, 12, 13, 14, 15]
+
+    with pytest.raises(InvalidInputException, match="Invalid winner counts."):
+        DrawClosePipeline(raffle, winner_counts={5: 3}).run()
+
+    assert raffle.raffle_results == {}
+
+def test_run_raises_payout_writer_error():
+    """Tests that the run method raises an error from the payout writer without storing results"""
+    raffle = create_raffle()
+
+    def failing_payout_writer(*args):
+        raise IOError("Payout file is not writable.")
+
+    with pytest.raises(IOError, match="Payout file is not writable."):
+        DrawClosePipeline(raffle, payout_writer=failing_payout_writer, chunk_size=1).run()
+
+    assert raffle.raffle_results == {}
+
+def test_run_writes_payouts_before_matching_every_chunk():
+    """Tests that the run method writes the payouts of a chunk before matching the next one when the winner counts are given"""
+    raffle = create_raffle()
+    events = []
+    pipeline = DrawClosePipeline(
+        raffle, payout_writer=lambda *payout: events.append("payout"),
+        winner_counts={2: 2, 3: 1, 4: 0, 5: 1}, chunk_size=1
+    )
+    match_tickets = pipeline.match_tickets
+
+    def recording_match_tickets(chunk_size):
+        for chunk in match_tickets(chunk_size):
+            events.append("chunk")
+            yield chunk
+
+    pipeline.match_tickets = recording_match_tickets
+    pipeline.run()
+
+    assert events == ["chunk", "payout", "payout", "chunk", "payout", "payout", "chunk"]
+
+def test_run_matches_single_chunk_without_payout_writer():
+    """Tests that the run method matches every user in one chunk when there is no payout writer"""
+    raffle = create_raffle()
+    pipeline = DrawClosePipeline(raffle, chunk_size=1)
+    match_tickets = pipeline.match_tickets
+    chunk_sizes = []
+
+    def recording_match_tickets(chunk_size):
+        chunk_sizes.append(chunk_size)
+        return match_tickets(chunk_size)
+
+    pipeline.match_tickets = recording_match_tickets
+    pipeline.run()
+
+    assert chunk_sizes == [3]
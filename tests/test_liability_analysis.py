@@ -0,0 +1,75 @@
+from collections import Counter
+from src.liability_analysis import LiabilityAnalysis
+from src.raffle import Raffle
+from src.ticket import Ticket
+from src.user import User
+
+def create_user(name, *ticket_numbers):
+    """Creates a user holding tickets with the given numbers"""
+    user = User(name)
+    for numbers in ticket_numbers:
+        ticket = Ticket()
+        ticket.numbers = list(numbers)
+        user.tickets.append(ticket)
+    return user
+
+def test_liability_analysis_covers_every_combination():
+    """Tests that the LiabilityAnalysis class analyses all 3003 possible winning combinations"""
+    analysis = LiabilityAnalysis([], 100)
+
+    assert len(analysis.winning_combinations) == 3003
+    assert len(analysis.winner_counts) == 3003
+    assert all(payout == 0 for payout in analysis.payouts)
+
+def test_get_outcome():
+    """Tests that the get_outcome method returns the winning ticket counts and payout for a set of winning numbers"""
+    users = [
+        create_user("Alice", [1, 2, 3, 4, 5], [1, 2, 3, 4, 6]),
+        create_user("Bob", [1, 2, 10, 11, 12], [13, 14, 15, 10, 11])
+    ]
+    analysis = LiabilityAnalysis(users, 1000)
+
+    winner_counts, payout = analysis.get_outcome([5, 4, 3, 2, 1])
+
+    assert winner_counts == {2: 1, 3: 0, 4: 1, 5: 1}
+    assert payout == 850
+
+def test_get_outcome_matches_raffle_results():
+    """Tests that the winning ticket counts match the calculate_raffle_results method for random tickets"""
+    users = [create_user(str(i), *(Ticket().numbers for _ in range(User.MAX_TICKETS))) for i in range(50)]
+    analysis = LiabilityAnalysis(users, 1000)
+
+    raffle = Raffle()
+    raffle.load_users(users)
+    raffle.pot_size = 1000
+    raffle.winning_numbers = [1, 4, 7, 10, 13]
+    raffle.calculate_raffle_results()
+
+    winner_counts, _ = analysis.get_outcome(raffle.winning_numbers)
+
+    for match_count, group_name in Raffle.GROUP_NAMES.items():
+        expected_count = sum(data['count'] for data in raffle.raffle_results[group_name].values())
+        assert winner_counts[match_count] == expected_count
+
+def test_get_worst_case_and_expected_payout():
+    """Tests that the get_worst_case and get_expected_payout methods summarise the payouts"""
+    users = [create_user("Alice", [1, 2, 3, 4, 5])]
+    analysis = LiabilityAnalysis(users, 1000)
+
+    winning_numbers, payout = analysis.get_worst_case()
+
+    assert winning_numbers == [1, 2, 3, 4, 5]
+    assert payout == 500
+    assert analysis.get_expected_payout() == sum(analysis.payouts) / 3003
+    assert 0 < analysis.get_expected_payout() < 500
+
+def test_from_histogram():
+    """Tests that the from_histogram method analyses a ticket histogram like the users' tickets it was built from"""
+    users = [create_user("Alice", [1, 2, 3, 4, 5], [1, 2, 3, 4, 6]), create_user("Bob", [1, 2, 3, 4, 5])]
+    ticket_histogram = Counter(ticket.get_number_mask() for user in users for ticket in user.tickets)
+
+    analysis = LiabilityAnalysis.from_histogram(ticket_histogram, 1000)
+    expected = LiabilityAnalysis(users, 1000)
+
+    assert analysis.winner_counts == expected.winner_counts
+    assert analysis.payouts == expected.payouts
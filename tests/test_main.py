@@ -1,9 +1,12 @@
 import io
 import pytest 
-from contextlib import redirect_stdout
+from contextlib import contextmanager, redirect_stdout
 from unittest.mock import patch
 from src.raffle import Raffle
-from src.main import display_menu, handle_menu_choice
+from src.ticket import Ticket
+from src.user import User
+from src.consumer.liability_aggregate import LiabilityAggregate
+from src.main import display_menu, display_payout, get_winner_counts, handle_menu_choice, parse_arguments
 from src.exception.invalid_operation_exception import InvalidOperationException
 from src.exception.invalid_input_exception import InvalidInputException
 
@@ -22,6 +25,7 @@ def test_display_menu():
         "\n[1] Start a New Draw\n"
         "[2] Buy Tickets\n"
         "[3] Run Raffle\n"
+        "[4] Analyse Liability\n"
     )
     
     assert printed_output == expected_output
@@ -56,6 +60,20 @@ def test_handle_menu_choice_buy_tickets_existing_draw():
         
         mock_add_user.assert_called_once_with("Alice")
 
+def test_handle_menu_choice_buy_tickets_records_purchase():
+    """Tests that the handle_menu_choice function publishes the purchased tickets to the purchase stream when user selects '2'"""
+    raffle = Raffle()
+    raffle.is_active = True
+    raffle.pot_size = 100
+
+    with patch("builtins.input", return_value="Alice, 3"), redirect_stdout(io.StringIO()):
+        handle_menu_choice(raffle, '2')
+
+    event = raffle.purchase_stream.events[0]
+    assert event.user_name == "Alice"
+    assert event.ticket_numbers == [ticket.numbers for ticket in raffle.users[0].tickets]
+    assert raffle.pot_size == 115
+
 def test_handle_menu_choice_buy_tickets_no_draw():
     """Tests that the handle_menu_choice function raises an exception when user selects '2' without starting a draw"""
     raffle = Raffle()
@@ -65,23 +83,74 @@ def test_handle_menu_choice_buy_tickets_no_draw():
             handle_menu_choice(raffle, '2')
 
 def test_handle_menu_choice_run_raffle_existing_draw():
-    """Tests that the handle_menu_choice function calls the necessary methods when user selects '3'"""
+    """Tests that the handle_menu_choice function settles the draw through the draw close pipeline when user selects '3'"""
     raffle = Raffle()
     
     with patch.object(raffle, "is_active", return_value=True), \
          patch.object(raffle, "generate_winning_numbers") as mock_generate_winning_numbers, \
-         patch.object(raffle, "calculate_raffle_results") as mock_calculate_raffle_results, \
-         patch.object(raffle, "display_winners") as mock_display_winners, \
+         patch("src.main.DrawClosePipeline") as mock_pipeline, \
          patch.object(raffle, "end_draw") as mock_end_draw, \
          patch("builtins.input", return_value=""):
-        
+        raffle.winning_numbers = [1, 2, 3, 4, 5]
+        mock_pipeline.return_value.run.return_value = {}
+
         handle_menu_choice(raffle, '3')
         
         mock_generate_winning_numbers.assert_called_once()
-        mock_calculate_raffle_results.assert_called_once()
-        mock_display_winners.assert_called_once_with(raffle.raffle_results)
+        mock_pipeline.assert_called_once_with(raffle, display_payout, None)
+        mock_pipeline.return_value.run.assert_called_once()
         mock_end_draw.assert_called_once()
 
+def test_handle_menu_choice_run_raffle_displays_payouts():
+    """Tests that the handle_menu_choice function displays each payout and the groups without winners when user selects '3'"""
+    raffle = Raffle()
+    raffle.is_active = True
+    raffle.pot_size = 1000
+    liability_aggregate = LiabilityAggregate()
+    raffle.purchase_stream.subscribe(liability_aggregate)
+    raffle.record_purchase("Alice", [[1, 2, 3, 4, 5], [1, 2, 10, 11, 12]])
+    raffle.record_purchase("Bob", [[1, 2, 3, 13, 14]])
+    output_buffer = io.StringIO()
+
+    def generate_winning_numbers():
+        raffle.winning_numbers = [1, 2, 3, 4, 5]
+
+    with patch.object(raffle, "generate_winning_numbers", side_effect=generate_winning_numbers), \
+         patch("builtins.input", return_value=""), redirect_stdout(output_buffer):
+        handle_menu_choice(raffle, '3', liability_aggregate=liability_aggregate)
+
+    printed_output = output_buffer.getvalue()
+
+    assert "Winning Ticket is 1 2 3 4 5" in printed_output
+    assert "Group 2: Alice with 1 winning ticket(s) - $101.5" in printed_output
+    assert "Group 3: Bob with 1 winning ticket(s) - $152.25" in printed_output
+    assert "Group 4: Nil" in printed_output
+    assert "Group 5 (Jackpot): Alice with 1 winning ticket(s) - $507.5" in printed_output
+    assert not raffle.is_active
+
+def test_get_winner_counts():
+    """Tests that the get_winner_counts function looks up the winning ticket counts of the drawn numbers in the live ticket histogram"""
+    raffle = Raffle()
+    liability_aggregate = LiabilityAggregate()
+    raffle.purchase_stream.subscribe(liability_aggregate)
+    raffle.record_purchase("Alice", [[1, 2, 3, 4, 5], [1, 2, 10, 11, 12]])
+    raffle.winning_numbers = [1, 2, 3, 4, 5]
+
+    assert get_winner_counts(raffle, liability_aggregate) == {2: 1, 3: 0, 4: 0, 5: 1}
+    assert get_winner_counts(raffle, None) is None
+
+def test_get_winner_counts_with_tickets_missing_from_aggregate():
+    """Tests that the get_winner_counts function returns None when the live ticket histogram does not cover every ticket"""
+    raffle = Raffle()
+    liability_aggregate = LiabilityAggregate()
+    raffle.purchase_stream.subscribe(liability_aggregate)
+    user = User("Alice")
+    user.tickets = [Ticket([1, 2, 3, 4, 5])]
+    raffle.load_users([user])
+    raffle.winning_numbers = [1, 2, 3, 4, 5]
+
+    assert get_winner_counts(raffle, liability_aggregate) is None
+
 def test_handle_menu_choice_run_raffle_no_draw():
     """Tests that the handle_menu_choice function raises an exception when user selects '3' without starting a draw"""
     raffle = Raffle()
@@ -89,9 +158,94 @@ def test_handle_menu_choice_run_raffle_no_draw():
     with pytest.raises(InvalidOperationException, match="Raffle draw has not started. Please start a new draw."):
         handle_menu_choice(raffle, '3')
 
+def test_handle_menu_choice_analyse_liability():
+    """Tests that the handle_menu_choice function displays the worst-case and expected payouts when user selects '4'"""
+    raffle = Raffle()
+    raffle.is_active = True
+    raffle.pot_size = 1000
+    user = User("Alice")
+    user.tickets = [Ticket([1, 2, 3, 4, 5])]
+    raffle.load_users([user])
+    output_buffer = io.StringIO()
+
+    with patch("builtins.input", return_value=""), redirect_stdout(output_buffer):
+        handle_menu_choice(raffle, '4')
+
+    printed_output = output_buffer.getvalue()
+
+    assert "Liability across 3003 possible winning tickets:" in printed_output
+    assert "Worst-case payout is $500.00 if the winning ticket is 1 2 3 4 5" in printed_output
+    assert "Expected payout is $" in printed_output
+
+def test_handle_menu_choice_analyse_liability_from_aggregate():
+    """Tests that the handle_menu_choice function analyses the liability from the live ticket histogram when given"""
+    raffle = Raffle()
+    raffle.is_active = True
+    raffle.pot_size = 1000
+    liability_aggregate = LiabilityAggregate()
+    raffle.purchase_stream.subscribe(liability_aggregate)
+    raffle.record_purchase("Alice", [[1, 2, 3, 4, 5]])
+    output_buffer = io.StringIO()
+
+    with patch("builtins.input", return_value=""), redirect_stdout(output_buffer):
+        handle_menu_choice(raffle, '4', liability_aggregate=liability_aggregate)
+
+    assert sum(liability_aggregate.ticket_histogram.values()) == 1
+    assert "Worst-case payout is $502.50 if the winning ticket is 1 2 3 4 5" in output_buffer.getvalue()
+
+def test_handle_menu_choice_analyse_liability_no_draw():
+    """Tests that the handle_menu_choice function raises an exception when user selects '4' without starting a draw"""
+    raffle = Raffle()
+
+    with pytest.raises(InvalidOperationException, match="Raffle draw has not started. Please start a new draw."):
+        handle_menu_choice(raffle, '4')
+
 def test_handle_menu_choice_invalid_option():
     """Tests that the handle_menu_choice function prints an error message for invalid choices"""
     raffle = Raffle()
     
     with pytest.raises(InvalidInputException, match="Invalid choice, please select again."):
-        handle_menu_choice(raffle, '4')
+        handle_menu_choice(raffle, '5')
+
+def test_handle_menu_choice_profiles_purchase_without_prompts():
+    """Tests that the handle_menu_choice function profiles ticket purchases but not the prompts waiting for the user"""
+    raffle = Raffle()
+    raffle.is_active = True
+    profiled_phases = []
+    active_phases = []
+    prompts_while_profiling = []
+
+    class RecordingProfiler:
+        @contextmanager
+        def profile_phase(self, phase):
+            profiled_phases.append(phase)
+            active_phases.append(phase)
+            yield
+            active_phases.pop()
+
+    def record_prompt(*args):
+        prompts_while_profiling.append(bool(active_phases))
+        return "Alice,2"
+
+    with patch("builtins.input", side_effect=record_prompt), redirect_stdout(io.StringIO()):
+        handle_menu_choice(raffle, '2', RecordingProfiler())
+
+    assert profiled_phases == ["purchase"]
+    assert prompts_while_profiling == [False, False]
+    assert len(raffle.users[0].tickets) == 2
+
+def test_parse_arguments_without_profile():
+    """Tests that the parse_arguments function disables profiling by default"""
+    args = parse_arguments([])
+
+    assert args.profile is None
+
+def test_parse_arguments_with_profile():
+    """Tests that the parse_arguments function enables profiling with a default or given report directory"""
+    assert parse_arguments(["--profile"]).profile == "profile"
+    assert parse_arguments(["--profile", "reports"]).profile == "reports"
+
+def test_parse_arguments_with_audit_log():
+    """Tests that the parse_arguments function takes an optional audit log file"""
+    assert parse_arguments([]).audit_log is None
+    assert parse_arguments(["--audit-log", "audit.log"]).audit_log == "audit.log"
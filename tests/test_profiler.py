@@ -0,0 +1,54 @@
+import os
+from src.profiler import Profiler
+from src.raffle import Raffle
+from src.ticket import Ticket
+from src.user import User
+
+def run_settlement():
+    """Settles a small raffle draw"""
+    raffle = Raffle()
+    raffle.pot_size = 1000
+    for i in range(200):
+        user = User(f"User {i}")
+        user.tickets = [Ticket() for _ in range(User.MAX_TICKETS)]
+        raffle.load_users([user])
+    raffle.generate_winning_numbers()
+    raffle.calculate_raffle_results()
+
+def test_profiler_initialisation():
+    """Tests that the Profiler class is initialised with no recorded phases"""
+    profiler = Profiler("profile")
+
+    assert profiler.output_dir == "profile"
+    assert profiler.profiles == {}
+    assert profiler.stack_samples == {}
+    assert profiler.allocations == {}
+
+def test_profile_phase():
+    """Tests that the profile_phase method records the profile and allocations of a phase"""
+    profiler = Profiler("profile")
+
+    with profiler.profile_phase("settlement"):
+        run_settlement()
+
+    assert list(profiler.profiles) == ["settlement"]
+    assert any("calculate_raffle_results" in label for label, _, _, _ in profiler.get_hot_spots("settlement"))
+    assert sum(profiler.allocations["settlement"].values()) > 0
+
+def test_write_reports(tmp_path):
+    """Tests that the write_reports method writes the cProfile dump, collapsed stacks and summary of each phase"""
+    profiler = Profiler(str(tmp_path))
+
+    with profiler.profile_phase("settlement"):
+        run_settlement()
+
+    summary_path = profiler.write_reports()
+
+    assert os.path.exists(tmp_path / "settlement.prof")
+    assert os.path.exists(tmp_path / "settlement.folded")
+
+    with open(summary_path) as summary_file:
+        summary = summary_file.read()
+
+    assert "Phase: settlement" in summary
+    assert "calculate_raffle_results" in summary
@@ -0,0 +1,119 @@
+import pytest
+from src.consumer.audit_log import AuditLog
+from src.consumer.liability_aggregate import LiabilityAggregate
+from src.consumer.pot_counter import PotCounter
+from src.consumer.ticket_store import TicketStore
+from src.consumer.purchase_consumer import PurchaseConsumer
+from src.purchase_event import PurchaseEvent
+from src.purchase_stream import PurchaseStream
+from src.raffle import Raffle
+from src.exception.invalid_operation_exception import InvalidOperationException
+
+def test_purchase_consumer_must_be_subclassed():
+    """Tests that the PurchaseConsumer base class cannot be instantiated without consume_batch and state methods"""
+    with pytest.raises(TypeError):
+        PurchaseConsumer()
+
+    assert AuditLog().position == 0
+
+def test_pot_counter():
+    """Tests that the PotCounter consumer adds the value of every purchased ticket to the pot"""
+    raffle = Raffle()
+    raffle.pot_size = 100
+
+    PotCounter(raffle).consume_batch([
+        PurchaseEvent(0, "Alice", [[1, 2, 3, 4, 5], [6, 7, 8, 9, 10]]),
+        PurchaseEvent(1, "Bob", [[1, 3, 5, 7, 9]])
+    ])
+
+    assert raffle.pot_size == 115
+
+def test_audit_log():
+    """Tests that the AuditLog consumer records an entry for every purchase"""
+    audit_log = AuditLog()
+
+    audit_log.consume_batch([PurchaseEvent(0, "Alice", [[1, 2, 3, 4, 5], [6, 7, 8, 9, 10]])])
+
+    assert audit_log.entries == ["#0 Alice purchased 2 ticket(s): 1 2 3 4 5, 6 7 8 9 10"]
+
+def test_liability_aggregate():
+    """Tests that the LiabilityAggregate consumer keeps a ticket histogram that can be analysed"""
+    aggregate = LiabilityAggregate()
+
+    aggregate.consume_batch([
+        PurchaseEvent(0, "Alice", [[1, 2, 3, 4, 5], [1, 2, 3, 4, 5]]),
+        PurchaseEvent(1, "Bob", [[1, 2, 10, 11, 12]])
+    ])
+
+    assert sum(aggregate.ticket_histogram.values()) == 3
+
+    winner_counts, payout = aggregate.get_analysis(1000).get_outcome([1, 2, 3, 4, 5])
+
+    assert winner_counts == {2: 1, 3: 0, 4: 0, 5: 2}
+    assert payout == 600
+
+def test_pot_counter_replay_does_not_double_count():
+    """Tests that replaying purchases to the PotCounter consumer adds each ticket to the pot once"""
+    raffle = Raffle()
+    raffle.pot_size = 100
+    checkpoint = raffle.pot_counter.checkpoint()
+
+    raffle.record_purchase("Alice", [[1, 2, 3, 4, 5], [6, 7, 8, 9, 10]])
+    raffle.record_purchase("Bob", [[1, 3, 5, 7, 9]])
+    raffle.purchase_stream.replay(raffle.pot_counter, checkpoint)
+
+    assert raffle.pot_size == 115
+
+def test_liability_aggregate_replay_and_reset():
+    """Tests that the LiabilityAggregate consumer rebuilds its histogram on replay and clears it for a new draw"""
+    stream = PurchaseStream()
+    aggregate = LiabilityAggregate()
+    stream.subscribe(aggregate)
+
+    stream.publish("Alice", [[1, 2, 3, 4, 5]])
+    stream.drain()
+    checkpoint = aggregate.checkpoint()
+    stream.publish("Bob", [[1, 2, 3, 4, 5]])
+    stream.drain()
+    stream.replay(aggregate, checkpoint)
+
+    assert sum(aggregate.ticket_histogram.values()) == 2
+
+    stream.reset()
+
+    assert aggregate.ticket_histogram == {}
+
+def test_audit_log_written_to_file(tmp_path):
+    """Tests that the AuditLog consumer appends entries to its file and rejects replaying entries already written"""
+    output_path = tmp_path / "audit.log"
+    stream = PurchaseStream()
+    audit_log = AuditLog(output_path)
+    stream.subscribe(audit_log)
+    checkpoint = audit_log.checkpoint()
+
+    stream.publish("Alice", [[1, 2, 3, 4, 5]])
+    stream.drain()
+
+    assert output_path.read_text() == "#0 Alice purchased 1 ticket(s): 1 2 3 4 5\n"
+    with pytest.raises(InvalidOperationException, match="cannot be replayed"):
+        stream.replay(audit_log, checkpoint)
+
+def test_ticket_store():
+    """Tests that the TicketStore consumer adds purchased tickets to the users and removes them again on replay"""
+    raffle = Raffle()
+    store = TicketStore(raffle)
+    raffle.purchase_stream.subscribe(store)
+
+    raffle.purchase_stream.publish("Alice", [[1, 2, 3, 4, 5]])
+    raffle.purchase_stream.poll(store)
+    checkpoint = store.checkpoint()
+    raffle.purchase_stream.publish("Bob", [[6, 7, 8, 9, 10], [1, 3, 5, 7, 9]])
+    raffle.purchase_stream.poll(store)
+    raffle.purchase_stream.replay(store, checkpoint)
+
+    assert [ticket.numbers for ticket in raffle.get_user_by_name("Alice").tickets] == [[1, 2, 3, 4, 5]]
+    assert [ticket.numbers for ticket in raffle.get_user_by_name("Bob").tickets] == [[6, 7, 8, 9, 10], [1, 3, 5, 7, 9]]
+    assert [list(number_masks) for number_masks in store.number_masks] == [
+        [0b111110],
+        [0b11111000000, 0b1010101010]
+    ]
@@ -0,0 +1,118 @@
+import pytest
+from src.purchase_rule_engine import PurchaseRuleEngine
+from src.user import User
+from src.exception.invalid_input_exception import InvalidInputException
+
+def test_purchase_rule_engine_initialisation():
+    """Tests that the PurchaseRuleEngine class is initialised with the default per-user limit and empty counters"""
+    engine = PurchaseRuleEngine()
+
+    assert engine.rules == [{"scope": "user", "limit": User.MAX_TICKETS}]
+    assert engine.user_limit == User.MAX_TICKETS
+    assert engine.user_limits == {}
+    assert engine.draw_limit is None
+    assert engine.user_ticket_counts == {}
+    assert engine.total_ticket_count == 0
+
+def test_compile_rules():
+    """Tests that the compile_rules method keeps the tightest limit of each scope"""
+    engine = PurchaseRuleEngine([
+        {"scope": "user", "limit": 5},
+        {"scope": "user", "limit": 3},
+        {"scope": "user", "limit": 1, "users": ["Alice"]},
+        {"scope": "draw", "limit": 100}
+    ])
+
+    assert engine.user_limit == 3
+    assert engine.user_limits == {"Alice": 1}
+    assert engine.draw_limit == 100
+
+def test_compile_invalid_rules():
+    """Tests that the PurchaseRuleEngine class rejects rules with an unknown scope or invalid limit"""
+    with pytest.raises(InvalidInputException, match="Invalid purchase rule. Scope must be one of user, draw."):
+        PurchaseRuleEngine([{"scope": "outlet", "limit": 5}])
+
+    with pytest.raises(InvalidInputException, match="Invalid purchase rule. Limit must be a non-negative integer."):
+        PurchaseRuleEngine([{"scope": "draw", "limit": -1}])
+
+def test_evaluate_accept_clip_and_reject():
+    """Tests that the evaluate method accepts, clips and rejects requests against the per-user limit"""
+    engine = PurchaseRuleEngine()
+
+    decisions = engine.evaluate([("Alice", 3), ("Alice", 3), ("Alice", 1), ("Bob", 5)])
+
+    user_rule = PurchaseRuleEngine.DEFAULT_RULES[0]
+
+    assert decisions == [
+        (PurchaseRuleEngine.ACCEPT, 3, None),
+        (PurchaseRuleEngine.CLIP, 2, user_rule),
+        (PurchaseRuleEngine.REJECT, 0, user_rule),
+        (PurchaseRuleEngine.ACCEPT, 5, None)
+    ]
+    assert engine.user_ticket_counts == {"Alice": 5, "Bob": 5}
+    assert engine.total_ticket_count == 10
+
+def test_evaluate_total_ticket_limit():
+    """Tests that the evaluate method enforces the total ticket limit of the draw"""
+    draw_rule = {"scope": "draw", "limit": 6}
+    engine = PurchaseRuleEngine([draw_rule])
+
+    decisions = engine.evaluate([("Alice", 4), ("Bob", 4), ("Charlie", 1)])
+
+    assert decisions == [
+        (PurchaseRuleEngine.ACCEPT, 4, None),
+        (PurchaseRuleEngine.CLIP, 2, draw_rule),
+        (PurchaseRuleEngine.REJECT, 0, draw_rule)
+    ]
+
+def test_evaluate_blocked_user():
+    """Tests that the evaluate method rejects every request from a blocked user"""
+    blocked_rule = {"scope": "user", "limit": 0, "users": ["Mallory"]}
+    engine = PurchaseRuleEngine([{"scope": "user", "limit": 5}, blocked_rule])
+
+    decisions = engine.evaluate([("Mallory", 1), ("Alice", 1)])
+
+    assert decisions == [(PurchaseRuleEngine.REJECT, 0, blocked_rule), (PurchaseRuleEngine.ACCEPT, 1, None)]
+    assert "Mallory" not in engine.user_ticket_counts
+
+def test_load_users():
+    """Tests that the load_users method seeds the counters from tickets already purchased"""
+    user = User("Alice")
+    user.tickets = [object(), object(), object()]
+
+    engine = PurchaseRuleEngine()
+    engine.load_users([user])
+
+    assert engine.get_remaining_allowance("Alice") == 2
+    assert engine.evaluate([("Alice", 5)]) == [(PurchaseRuleEngine.CLIP, 2, PurchaseRuleEngine.DEFAULT_RULES[0])]
+
+def test_reset():
+    """Tests that the reset method clears the counters but keeps the rules"""
+    engine = PurchaseRuleEngine([{"scope": "draw", "limit": 10}, {"scope": "user", "limit": 0, "users": ["Mallory"]}])
+    engine.evaluate([("Alice", 5)])
+
+    engine.reset()
+
+    assert engine.user_ticket_counts == {}
+    assert engine.total_ticket_count == 0
+    assert engine.draw_limit == 10
+    assert engine.get_remaining_allowance("Mallory") == 0
+
+def test_evaluate_without_limits():
+    """Tests that the evaluate method accepts every request when no rule limits the user"""
+    engine = PurchaseRuleEngine([])
+
+    assert engine.get_remaining_allowance("Alice") is None
+    assert engine.evaluate([("Alice", 50)]) == [(PurchaseRuleEngine.ACCEPT, 50, None)]
+
+def test_get_limiting_rule():
+    """Tests that the get_limiting_rule method returns the rule leaving the user the fewest tickets"""
+    user_rule = {"scope": "user", "limit": 5}
+    draw_rule = {"scope": "draw", "limit": 7}
+    engine = PurchaseRuleEngine([user_rule, draw_rule])
+
+    assert engine.get_limiting_rule("Alice") == (5, user_rule)
+
+    engine.evaluate([("Bob", 5)])
+
+    assert engine.get_limiting_rule("Alice") == (2, draw_rule)
@@ -0,0 +1,153 @@
+import pytest
+from src.consumer.purchase_consumer import PurchaseConsumer
+from src.purchase_stream import PurchaseStream
+from src.exception.invalid_operation_exception import InvalidOperationException
+
+class RecordingConsumer(PurchaseConsumer):
+    """Consumer that records the batches it receives"""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def consume_batch(self, events):
+        self.batches.append([event.sequence for event in events])
+
+    def get_state(self):
+        return list(self.batches)
+
+    def restore_state(self, state):
+        self.batches = list(state)
+
+def test_purchase_stream_initialisation():
+    """Tests that the PurchaseStream class is initialised with an empty ring buffer"""
+    stream = PurchaseStream(capacity=4)
+
+    assert stream.events == [None] * 4
+    assert stream.next_sequence == 0
+    assert stream.consumers == []
+
+def test_publish_does_not_deliver_events():
+    """Tests that the publish method only stores the event until consumers are polled"""
+    stream = PurchaseStream()
+    consumer = RecordingConsumer()
+    stream.subscribe(consumer)
+
+    event = stream.publish("Alice", [[1, 2, 3, 4, 5]])
+
+    assert event.sequence == 0
+    assert event.user_name == "Alice"
+    assert event.ticket_numbers == [[1, 2, 3, 4, 5]]
+    assert consumer.batches == []
+
+def test_poll_delivers_unread_events_as_batch():
+    """Tests that the poll method delivers every unread event to a consumer in a single batch"""
+    stream = PurchaseStream()
+    consumer = RecordingConsumer()
+    stream.subscribe(consumer)
+
+    stream.publish("Alice", [[1, 2, 3, 4, 5]])
+    stream.publish("Bob", [[6, 7, 8, 9, 10]])
+
+    assert stream.poll(consumer) == 2
+    assert stream.poll(consumer) == 0
+    assert consumer.batches == [[0, 1]]
+    assert consumer.position == 2
+
+def test_drain_delivers_to_every_consumer():
+    """Tests that the drain method delivers unread events to every consumer from its own position"""
+    stream = PurchaseStream()
+    early_consumer = RecordingConsumer()
+    stream.subscribe(early_consumer)
+    stream.publish("Alice", [[1, 2, 3, 4, 5]])
+
+    late_consumer = RecordingConsumer()
+    stream.subscribe(late_consumer)
+    stream.publish("Bob", [[6, 7, 8, 9, 10]])
+
+    stream.drain()
+
+    assert early_consumer.batches == [[0, 1]]
+    assert late_consumer.batches == [[1]]
+
+def test_publish_does_not_catch_up_lagging_consumer():
+    """Tests that the publish method overwrites the events of a lagging consumer, whose next poll raises an exception"""
+    stream = PurchaseStream(capacity=2)
+    lagging_consumer = RecordingConsumer()
+    consumer = RecordingConsumer()
+    stream.subscribe(lagging_consumer)
+    stream.subscribe(consumer)
+
+    for name in ["Alice", "Bob", "Charlie"]:
+        stream.publish(name, [[1, 2, 3, 4, 5]])
+        stream.poll(consumer)
+
+    assert lagging_consumer.batches == []
+
+    stream.publish("Dave", [[1, 2, 3, 4, 5]])
+    errors = stream.drain()
+
+    assert [str(error) for error in errors] == [
+        "RecordingConsumer has fallen behind. Purchase events before #2 are no longer retained."
+    ]
+    assert consumer.batches == [[0], [1], [2], [3]]
+
+def test_catch_up_polls_consumers_in_batches():
+    """Tests that the catch_up method only polls consumers with a full batch of unread events"""
+    stream = PurchaseStream(capacity=4, batch_size=2)
+    consumer = RecordingConsumer()
+    stream.subscribe(consumer)
+
+    for name in ["Alice", "Bob", "Charlie", "Dave", "Eve"]:
+        stream.publish(name, [[1, 2, 3, 4, 5]])
+        stream.catch_up()
+
+    assert consumer.batches == [[0, 1], [2, 3]]
+    assert stream.drain() == []
+    assert consumer.batches == [[0, 1], [2, 3], [4]]
+
+def test_replay_from_checkpoint():
+    """Tests that the replay method restores the consumer's state and delivers retained events again from a checkpoint"""
+    stream = PurchaseStream()
+    consumer = RecordingConsumer()
+    stream.subscribe(consumer)
+
+    stream.publish("Alice", [[1, 2, 3, 4, 5]])
+    stream.drain()
+    checkpoint = consumer.checkpoint()
+
+    for name in ["Bob", "Charlie"]:
+        stream.publish(name, [[1, 2, 3, 4, 5]])
+    stream.drain()
+
+    assert stream.replay(consumer, checkpoint) == 2
+    assert consumer.batches == [[0], [1, 2]]
+
+def test_replay_before_oldest_retained_event():
+    """Tests that the replay method raises an exception when the checkpoint has been overwritten"""
+    stream = PurchaseStream(capacity=2)
+    consumer = RecordingConsumer()
+    stream.subscribe(consumer)
+    checkpoint = consumer.checkpoint()
+
+    for name in ["Alice", "Bob", "Charlie"]:
+        stream.publish(name, [[1, 2, 3, 4, 5]])
+
+    with pytest.raises(InvalidOperationException, match="Purchase events before #1 are no longer retained."):
+        stream.replay(consumer, checkpoint)
+
+def test_reset_starts_new_draw():
+    """Tests that the reset method drops the events of the previous draw and resets every consumer"""
+    stream = PurchaseStream()
+    consumer = RecordingConsumer()
+    stream.subscribe(consumer)
+    checkpoint = consumer.checkpoint()
+    stream.publish("Alice", [[1, 2, 3, 4, 5]])
+
+    stream.reset()
+    stream.publish("Bob", [[1, 2, 3, 4, 5]])
+    stream.drain()
+
+    assert consumer.batches == [[1]]
+    with pytest.raises(InvalidOperationException, match="Purchase events before #1 are no longer retained."):
+        stream.replay(consumer, checkpoint)
@@ -3,6 +3,11 @@ import pytest
 from contextlib import redirect_stdout
 from unittest.mock import patch, call, MagicMock
 from src.raffle import Raffle
+from src.raffle_results import RaffleResults
+from src.purchase_rule_engine import PurchaseRuleEngine
+from src.ticket import Ticket
+from src.consumer.audit_log import AuditLog
+from src.consumer.liability_aggregate import LiabilityAggregate
 from src.user import User
 from src.exception.invalid_input_exception import InvalidInputException
 
@@ -51,7 +56,7 @@ def test_get_existing_user_by_name():
     user2 = User("Bob")
     user3 = User("Charlie")
     
-    raffle.users.extend([user1, user2, user3])
+    raffle.load_users([user1, user2, user3])
     result = raffle.get_user_by_name("Bob")
     
     assert result is not None
@@ -62,7 +67,7 @@ def test_get_non_existing_user_by_name():
     """Tests that the get_user_by_name method returns None when the user does not exist"""
     raffle = Raffle()
     
-    raffle.users.append(User("Alice"))
+    raffle.add_user("Alice")
     result = raffle.get_user_by_name("Bob")
     
     assert result is None 
@@ -110,6 +115,30 @@ def test_add_user():
     assert len(raffle.users) == 1
     assert raffle.users[0].name == "Alice"
 
+def test_add_user_records_user_id():
+    """Tests that the add_user method records each new user's position in the user list and returns existing users by name"""
+    raffle = Raffle()
+    alice = raffle.add_user("Alice")
+    bob = raffle.add_user("Bob")
+
+    assert raffle.user_ids == {"Alice": 0, "Bob": 1}
+    assert raffle.add_user("Alice") is alice
+    assert raffle.get_user_by_name("Bob") is bob
+    assert len(raffle.users) == 2
+
+def test_add_user_after_load_users():
+    """Tests that the add_user method continues the user ids of loaded users"""
+    raffle = Raffle()
+    bob = User("Bob")
+    raffle.load_users([bob])
+
+    alice = raffle.add_user("Alice")
+
+    assert raffle.add_user("Alice") is alice
+    assert raffle.add_user("Bob") is bob
+    assert raffle.user_ids == {"Bob": 0, "Alice": 1}
+    assert raffle.users == [bob, alice]
+
 def test_increase_pot_size():
     """Tests that the increase_pot_size method correctly increases the pot size based on the number of tickets purchased"""
     raffle = Raffle()
@@ -118,6 +147,87 @@ def test_increase_pot_size():
     
     assert raffle.pot_size == 115
 
+def test_purchase_tickets():
+    """Tests that the purchase_tickets method issues the tickets granted by the purchase rules and publishes the purchase"""
+    raffle = Raffle()
+    user = raffle.add_user("Alice")
+
+    with redirect_stdout(io.StringIO()):
+        new_tickets = raffle.purchase_tickets(user, 3)
+
+    assert len(new_tickets) == 3
+    assert [ticket.numbers for ticket in user.tickets] == [ticket.numbers for ticket in new_tickets]
+    assert raffle.purchase_rules.user_ticket_counts == {"Alice": 3}
+    assert raffle.purchase_stream.events[0].ticket_numbers == [ticket.numbers for ticket in new_tickets]
+
+def test_purchase_tickets_clipped_and_rejected():
+    """Tests that the purchase_tickets method clips and rejects purchases beyond the purchase rules"""
+    raffle = Raffle()
+    user = raffle.add_user("Alice")
+
+    output_buffer = io.StringIO()
+    with redirect_stdout(output_buffer):
+        raffle.purchase_tickets(user, 3)
+        raffle.purchase_tickets(user, 3)
+        rejected_tickets = raffle.purchase_tickets(user, 1)
+
+    printed_output = output_buffer.getvalue()
+
+    assert len(user.tickets) == User.MAX_TICKETS
+    assert rejected_tickets == []
+    assert "Alice requested 3 tickets, but only 2 more ticket(s) can be purchased." in printed_output
+    assert printed_output.strip().endswith(f"Alice has already purchased the maximum of {User.MAX_TICKETS} tickets and cannot buy more.")
+
+def test_purchase_tickets_rejection_messages():
+    """Tests that the purchase_tickets method explains which purchase rule rejected a purchase"""
+    raffle = Raffle()
+    raffle.purchase_rules = PurchaseRuleEngine([
+        {"scope": "draw", "limit": 2},
+        {"scope": "user", "limit": 0, "users": ["Mallory"]}
+    ])
+
+    output_buffer = io.StringIO()
+    with redirect_stdout(output_buffer):
+        raffle.purchase_tickets(raffle.add_user("Mallory"), 1)
+        raffle.purchase_tickets(raffle.add_user("Alice"), 2)
+        raffle.purchase_tickets(raffle.add_user("Bob"), 1)
+
+    printed_output = output_buffer.getvalue()
+
+    assert "Mallory is not allowed to purchase tickets." in printed_output
+    assert "The draw has sold the maximum of 2 tickets, so Bob cannot buy more." in printed_output
+
+def test_load_users():
+    """Tests that the load_users method adds users holding tickets and counts their tickets against the purchase rules"""
+    raffle = Raffle()
+    user = User("Alice")
+    user.tickets = [Ticket() for _ in range(3)]
+
+    raffle.load_users([user])
+
+    assert raffle.get_user_by_name("Alice") is user
+    assert raffle.purchase_rules.get_remaining_allowance("Alice") == 2
+
+def test_record_purchase():
+    """Tests that the record_purchase method publishes the purchase and brings the pot up to date"""
+    raffle = Raffle()
+    raffle.is_active = True
+    raffle.pot_size = 100
+
+    raffle.record_purchase("Alice", [[1, 2, 3, 4, 5], [6, 7, 8, 9, 10]])
+
+    assert raffle.purchase_stream.next_sequence == 1
+    assert raffle.pot_size == 110
+    assert raffle.get_draw_status() == "Status: Draw is ongoing. Raffle pot size is $110"
+
+def test_record_purchase_without_tickets():
+    """Tests that the record_purchase method does not publish a purchase without tickets"""
+    raffle = Raffle()
+
+    raffle.record_purchase("Alice", [])
+
+    assert raffle.purchase_stream.next_sequence == 0
+
 def test_generate_winning_numbers():
     """Tests that the generate_winning_numbers method sets the winning numbers correctly"""
     raffle = Raffle()
@@ -131,13 +241,12 @@ def test_generate_winning_numbers():
 def test_calculate_raffle_results_for_single_win():
     """Tests that the calculate_raffle_results method correctly calculates the raffle results for a single winner"""
     raffle = Raffle()
-    mock_user = MagicMock(spec=User)
-    mock_user.name = "Alice"
-    mock_user.tickets = [MagicMock()]
-    mock_user.tickets[0].count_matching_numbers = MagicMock(return_value=3)
+    user = User("Alice")
+    user.tickets = [Ticket([1, 2, 3, 10, 11])]
     
-    raffle.users.append(mock_user)
+    raffle.load_users([user])
     raffle.pot_size = 1000
+    raffle.winning_numbers = [1, 2, 3, 4, 5]
     raffle.calculate_raffle_results()
     
     assert "Group 3" in raffle.raffle_results
@@ -150,14 +259,11 @@ def test_calculate_raffle_results_for_multiple_wins_same_group():
     raffle = Raffle()
     raffle.pot_size = 1000
 
-    user = MagicMock(spec=User)
-    user.name = "Alice"
-    user.tickets = [MagicMock(), MagicMock()]
-
-    user.tickets[0].count_matching_numbers = MagicMock(return_value=2)
-    user.tickets[1].count_matching_numbers = MagicMock(return_value=2)
+    user = User("Alice")
+    user.tickets = [Ticket([1, 2, 10, 11, 12]), Ticket([4, 5, 13, 14, 15])]
 
-    raffle.users.append(user)    
+    raffle.load_users([user])
+    raffle.winning_numbers = [1, 2, 3, 4, 5]
     raffle.calculate_raffle_results()
     
     assert "Group 2" in raffle.raffle_results
@@ -211,10 +317,21 @@ def test_calculate_total_winnings():
     total_winnings = raffle.calculate_total_winnings(raffle.raffle_results)
     assert total_winnings == 625
 
+def test_calculate_total_winnings_from_raffle_results():
+    """Tests that the calculate_total_winnings method reads the precomputed total of a RaffleResults instance"""
+    raffle = Raffle()
+    raffle.users = [User("Alice"), User("Charlie")]
+    raffle.raffle_results = RaffleResults(Raffle.GROUP_NAMES.values(), raffle.users)
+    raffle.raffle_results.add_winner(0, 0, 1, 50)
+    raffle.raffle_results.add_winner(3, 1, 1, 500)
+
+    assert raffle.calculate_total_winnings(raffle.raffle_results) == 550
+
 def test_reset_draw():
     """Tests that the reset_draw method resets the raffle draw state"""
     raffle = Raffle()
     raffle.is_active = True
+    raffle.record_purchase("Alice", [[1, 2, 3, 4, 5]])
     raffle.users = [MagicMock(spec=User)]
     raffle.winning_numbers = [1, 2, 3, 4, 5]
     
@@ -222,6 +339,10 @@ def test_reset_draw():
     
     assert raffle.is_active is False
     assert raffle.users == []
+    assert raffle.user_ids == {}
+    assert raffle.purchase_rules.user_ticket_counts == {}
+    assert raffle.purchase_stream.get_oldest_sequence() == raffle.purchase_stream.next_sequence
+    assert raffle.pot_counter.ticket_count == 0
     assert raffle.winning_numbers == []
 
 def test_end_draw():
@@ -237,4 +358,59 @@ def test_end_draw():
         raffle.end_draw()
 
     assert raffle.pot_size == 875  
-    mock_reset.assert_called_once()
\ No newline at end of file
+    mock_reset.assert_called_once()
+
+def test_calculate_raffle_results_for_jackpot():
+    """Tests that the calculate_raffle_results method records a jackpot win under the jackpot prize group"""
+    raffle = Raffle()
+    raffle.pot_size = 1000
+
+    user = User("Alice")
+    user.tickets = [Ticket([1, 2, 3, 4, 5])]
+
+    raffle.load_users([user])
+    raffle.winning_numbers = [1, 2, 3, 4, 5]
+    raffle.calculate_raffle_results()
+
+    assert raffle.raffle_results["Group 5 (Jackpot)"]["Alice"] == {'count': 1, 'total_reward': 500.0}
+
+def test_settle_draw_with_more_purchases_than_stream_capacity():
+    """Tests that a draw with more purchases than the purchase stream retains can be settled and ended with optional consumers subscribed"""
+    raffle = Raffle()
+    raffle.is_active = True
+    liability_aggregate = LiabilityAggregate()
+    audit_log = AuditLog()
+    raffle.purchase_stream.subscribe(liability_aggregate)
+    raffle.purchase_stream.subscribe(audit_log)
+    purchase_count = raffle.purchase_stream.capacity + 100
+
+    with redirect_stdout(io.StringIO()):
+        for i in range(purchase_count):
+            raffle.purchase_tickets(raffle.add_user(f"User {i}"), 1)
+
+        raffle.generate_winning_numbers()
+        raffle.calculate_raffle_results()
+        raffle.end_draw()
+
+    assert len(audit_log.entries) == purchase_count
+    assert raffle.is_active is False
+
+def test_end_draw_reports_lagging_consumer():
+    """Tests that the end_draw method reports an optional consumer that has fallen behind and still ends the draw"""
+    raffle = Raffle()
+    raffle.is_active = True
+    audit_log = AuditLog()
+    raffle.purchase_stream.subscribe(audit_log)
+
+    # Publishing directly skips the batched polling of optional consumers done by record_purchase
+    for i in range(raffle.purchase_stream.capacity + 1):
+        raffle.purchase_stream.publish(f"User {i}", [[1, 2, 3, 4, 5]])
+        raffle.apply_purchases()
+
+    output_buffer = io.StringIO()
+    with redirect_stdout(output_buffer):
+        raffle.calculate_raffle_results()
+        raffle.end_draw()
+
+    assert "AuditLog has fallen behind. Purchase events before #1 are no longer retained." in output_buffer.getvalue()
+    assert raffle.is_active is False
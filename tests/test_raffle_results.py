@@ -0,0 +1,58 @@
+import pytest
+from src.raffle_results import RaffleResults
+from src.user import User
+
+GROUP_NAMES = ["Group 2", "Group 3", "Group 4", "Group 5 (Jackpot)"]
+USERS = [User("Alice"), User("Bob")]
+
+def test_raffle_results_initialisation():
+    """Tests that the RaffleResults class is initialised with every prize group and no winners"""
+    results = RaffleResults(GROUP_NAMES, USERS)
+
+    assert list(results) == GROUP_NAMES
+    assert len(results) == 4
+    assert results == {group_name: {} for group_name in GROUP_NAMES}
+    assert results.get_total_winnings() == 0
+
+def test_add_winner():
+    """Tests that the add_winner method records the winner and updates the prize group totals"""
+    results = RaffleResults(GROUP_NAMES, USERS)
+
+    results.add_winner(0, 0, 2, 33.33)
+    results.add_winner(0, 1, 1, 16.67)
+    results.add_winner(3, 0, 1, 500.0)
+
+    assert [list(user_ids) for user_ids in results.user_ids] == [[0, 1], [], [], [0]]
+    assert results["Group 2"] == {
+        "Alice": {'count': 2, 'total_reward': 33.33},
+        "Bob": {'count': 1, 'total_reward': 16.67}
+    }
+    assert results["Group 3"] == {}
+    assert results["Group 5 (Jackpot)"]["Alice"] == {'count': 1, 'total_reward': 500.0}
+    assert results.get_group_total("Group 2") == 50.0
+    assert results.get_group_total("Group 5 (Jackpot)") == 500.0
+    assert results.get_total_winnings() == 550.0
+
+def test_get_unknown_group():
+    """Tests that reading an unknown prize group raises a KeyError like a dictionary"""
+    results = RaffleResults(GROUP_NAMES, USERS)
+
+    with pytest.raises(KeyError):
+        results["Group 6"]
+
+    assert results.get("Group 6") is None
+
+def test_group_winners_refreshed_after_add_winner():
+    """Tests that a prize group read before more winners are added includes the later winners when read again"""
+    results = RaffleResults(GROUP_NAMES, USERS)
+    results.add_winner(1, 0, 1, 30.0)
+
+    assert results["Group 3"] is results["Group 3"]
+
+    results.add_winner(1, 1, 1, 30.0)
+
+    assert results["Group 3"] == {
+        "Alice": {'count': 1, 'total_reward': 30.0},
+        "Bob": {'count': 1, 'total_reward': 30.0}
+    }
+    assert results.get_group_total("Group 3") == 60.0
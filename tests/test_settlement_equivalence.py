@@ -0,0 +1,130 @@
+"""
+Differential tests comparing the reference Raffle.calculate_raffle_results settlement with
+alternative settlement engines on randomised draws of increasing size. Draws are run in
+parallel across cores. The largest draw size and the number of draws per size can be raised
+with the RAFFLE_EQUIVALENCE_TICKETS and RAFFLE_EQUIVALENCE_DRAWS environment variables,
+e.g. RAFFLE_EQUIVALENCE_TICKETS=1000000 for million-ticket checks.
+"""
+import os
+import random
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from src.draw_close_pipeline import DrawClosePipeline
+from src.liability_analysis import LiabilityAnalysis
+from src.raffle import Raffle
+from src.ticket import Ticket
+from src.user import User
+
+MAX_TICKETS = int(os.environ.get("RAFFLE_EQUIVALENCE_TICKETS", 20000))
+DRAWS_PER_SIZE = int(os.environ.get("RAFFLE_EQUIVALENCE_DRAWS", 4))
+DRAW_SIZES = [10 ** exponent for exponent in range(1, 7) if 10 ** exponent < MAX_TICKETS] + [MAX_TICKETS]
+
+def create_draw(seed, ticket_count):
+    """Creates the users, pot size and winning numbers of a randomised draw"""
+    rng = random.Random(seed)
+    users = []
+
+    for start in range(0, ticket_count, User.MAX_TICKETS):
+        user = User(f"User {len(users)}")
+        for _ in range(min(User.MAX_TICKETS, ticket_count - start)):
+            ticket = Ticket()
+            ticket.numbers = sorted(rng.sample(range(1, 16), 5))
+            user.tickets.append(ticket)
+        users.append(user)
+
+    pot_size = 100 + 5 * ticket_count + rng.randint(0, 1000)
+    winning_numbers = sorted(rng.sample(range(1, 16), 5))
+    return users, pot_size, winning_numbers
+
+def summarise_settlement(raffle):
+    """Ends a settled draw and summarises its winner counts, per-user payouts and resulting pot size"""
+    group_names = {group_name: match_count for match_count, group_name in Raffle.GROUP_NAMES.items()}
+    winner_counts = {match_count: 0 for match_count in Raffle.PRIZE_GROUPS}
+    payouts = {}
+
+    for group_name, winners in raffle.raffle_results.items():
+        for user_name, data in winners.items():
+            winner_counts[group_names[group_name]] += data['count']
+            payouts[(group_name, user_name)] = (data['count'], data['total_reward'])
+
+    raffle.end_draw()
+    return {'winner_counts': winner_counts, 'payouts': payouts, 'pot_size': raffle.pot_size}
+
+def settle_with_reference(users, pot_size, winning_numbers):
+    """Settles a draw with Raffle.calculate_raffle_results and Raffle.end_draw"""
+    raffle = Raffle()
+    raffle.load_users(users)
+    raffle.pot_size = pot_size
+    raffle.winning_numbers = winning_numbers
+    raffle.calculate_raffle_results()
+    return summarise_settlement(raffle)
+
+def settle_with_liability_analysis(users, pot_size, winning_numbers):
+    """Settles a draw at prize group level with the LiabilityAnalysis outcome for the winning numbers"""
+    winner_counts, total_payout = LiabilityAnalysis(users, pot_size).get_outcome(winning_numbers)
+    return {'winner_counts': winner_counts, 'payouts': None, 'pot_size': max(0, pot_size - total_payout)}
+
+def settle_with_draw_close_pipeline(users, pot_size, winning_numbers, winner_counts=None):
+    """Settles a draw with the DrawClosePipeline and Raffle.end_draw"""
+    raffle = Raffle()
+    raffle.load_users(users)
+    raffle.pot_size = pot_size
+    raffle.winning_numbers = winning_numbers
+    DrawClosePipeline(raffle, winner_counts=winner_counts, chunk_size=100).run()
+    return summarise_settlement(raffle)
+
+def settle_with_draw_close_pipeline_and_known_winner_counts(users, pot_size, winning_numbers):
+    """Settles a draw with the DrawClosePipeline given the winner counts from a LiabilityAnalysis"""
+    winner_counts, _ = LiabilityAnalysis(users, pot_size).get_outcome(winning_numbers)
+    return settle_with_draw_close_pipeline(users, pot_size, winning_numbers, winner_counts)
+
+# Alternative engines compared against the reference. Engines returning per-user payouts as None
+# only settle prize group totals, so their pot is compared within the per-user rounding error.
+SETTLEMENT_ENGINES = {
+    "liability_analysis": settle_with_liability_analysis,
+    "draw_close_pipeline": settle_with_draw_close_pipeline,
+    "draw_close_pipeline_with_known_winner_counts": settle_with_draw_close_pipeline_and_known_winner_counts
+}
+
+def run_equivalence_check(seed, ticket_count):
+    """Settles a randomised draw with every engine and returns a description of each mismatch"""
+    users, pot_size, winning_numbers = create_draw(seed, ticket_count)
+    expected = settle_with_reference(users, pot_size, winning_numbers)
+    mismatches = []
+
+    for engine_name, engine in SETTLEMENT_ENGINES.items():
+        actual = engine(users, pot_size, winning_numbers)
+        label = f"{engine_name} (seed {seed}, {ticket_count} tickets)"
+
+        if actual['winner_counts'] != expected['winner_counts']:
+            mismatches.append(f"{label}: winner counts {actual['winner_counts']} != {expected['winner_counts']}")
+
+        if actual['payouts'] is None:
+            rounding_tolerance = 0.005 * len(expected['payouts']) + 1e-6
+            if abs(actual['pot_size'] - expected['pot_size']) > rounding_tolerance:
+                mismatches.append(f"{label}: pot size {actual['pot_size']} != {expected['pot_size']}")
+            continue
+
+        if actual['payouts'] != expected['payouts']:
+            mismatches.append(f"{label}: per-user payouts differ")
+
+        if actual['pot_size'] != expected['pot_size']:
+            mismatches.append(f"{label}: pot size {actual['pot_size']} != {expected['pot_size']}")
+
+    return mismatches
+
+@pytest.fixture(scope="module")
+def executor():
+    """Provides a process pool with a worker per core"""
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+        yield pool
+
+@pytest.mark.parametrize("ticket_count", DRAW_SIZES)
+def test_settlement_engines_match_reference(executor, ticket_count):
+    """Tests that every alternative settlement engine matches the reference settlement on randomised draws"""
+    seeds = [ticket_count * DRAWS_PER_SIZE + draw for draw in range(DRAWS_PER_SIZE)]
+    futures = [executor.submit(run_equivalence_check, seed, ticket_count) for seed in seeds]
+
+    mismatches = [mismatch for future in futures for mismatch in future.result()]
+
+    assert mismatches == []
@@ -26,3 +26,10 @@ def test_display_numbers():
     
     displayed_numbers = ticket.display_numbers().split()
     assert displayed_numbers == list(map(str, ticket.numbers))
+
+def test_get_number_mask():
+    """Tests that the get_number_mask method sets one bit for each number on the ticket"""
+    ticket = Ticket()
+    ticket.numbers = [1, 2, 3, 4, 15]
+
+    assert ticket.get_number_mask() == 0b1000000000011110
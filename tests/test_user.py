@@ -39,3 +39,15 @@ def test_buy_tickets_after_reaching_limit():
     expected_message = f"Charlie has already purchased the maximum of {User.MAX_TICKETS} tickets and cannot buy more."
     
     assert printed_output == expected_message
+
+def test_generate_tickets():
+    """Tests that the generate_tickets method generates tickets without checking the purchase limit or keeping them"""
+    user = User("Alice")
+
+    output_buffer = io.StringIO()
+    with redirect_stdout(output_buffer):
+        new_tickets = user.generate_tickets(User.MAX_TICKETS + 1)
+
+    assert len(new_tickets) == User.MAX_TICKETS + 1
+    assert user.tickets == []
+    assert "Hi Alice, you are purchasing 6 ticket(s)." in output_buffer.getvalue()